@@ -1,48 +1,37 @@
-import pandas as pd
-from typing import List, Optional
+from __future__ import annotations  #анотації з pd не потребують імпорту pandas
 
+import argparse
+from contextlib import ExitStack
+from itertools import islice, repeat
+import math
+from operator import attrgetter
+import sys
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional, Type
 
-class Employee: #свт. класу для всіх працівників ліцею(загальні атрибути та поліморфізм)
-    def __init__(self, full_name: str, base_salary: float):
-        self.full_name = full_name
-        self.base_salary = base_salary
-        self.salary: Optional[float] = None
-        self.bonus: float = 0.0
+from lazy import lazy_import
+from ledger import PERIOD_RE, PayrollLedger, PayrollWriter, current_period
+from staff import Director, Employee, SecurityGuard, Teacher
 
-    def calculate_salary(self) -> float:
-        raise NotImplementedError
+np = lazy_import('numpy')  #лише для пакетного розрахунку
+pd = lazy_import('pandas')  #лише для відомості у вигляді DataFrame
 
+if TYPE_CHECKING:
+    import jobs  #пул фонових задач потрібен лише з --background, тож імпортується там, де використовується
 
-class Teacher(Employee): #вчитель успадковує Employee
-    def __init__(self, full_name: str, base_salary: float, teaching_experience: int):
-        super().__init__(full_name, base_salary)
-        self.teaching_experience = teaching_experience
 
-    def calculate_salary(self) -> float: #оброхування зп вчителів
-        self.salary = self.base_salary * self.teaching_experience / 30.0
-        return self.salary
+PAYROLL_COLUMNS = ["ПІБ", "Посада", "Ставка", "Бонус", "До видачі"]
+PROGRESS_ROWS = 1000  #як часто run_salary_process повідомляє прогрес
 
 
-class SecurityGuard(Employee): #охоронець так само успадковує Employee
-    def __init__(self, full_name: str, base_salary: float, total_experience: int):
-        super().__init__(full_name, base_salary)
-        self.total_experience = total_experience
-
-    def calculate_salary(self) -> float:# зп охоронця
-        self.salary = self.base_salary + self.total_experience * 250.0
-        return self.salary
-
-
-class Director(Employee):  #директор також успадковує Employee
-    def __init__(self, full_name: str, base_salary: float, teaching_experience: int, management_experience: int):
-        super().__init__(full_name, base_salary)
-        self.teaching_experience = teaching_experience
-        self.management_experience = management_experience
-
-    def calculate_salary(self) -> float: #розрахунок зп директора
-        self.salary = (self.base_salary * self.teaching_experience / 50.0 +
-                       self.management_experience * 500.0)
-        return self.salary
+def round_cents(values: np.ndarray) -> List[float]:
+    #те саме, що round(x, 2) для кожного значення: rint(x * 100) / 100 дає той самий float, крім значень,
+    #у яких x * 100 в межах похибки множення від половини між цілими, - їх округлює сам round
+    scaled = values * 100.0
+    rounded = np.rint(scaled) / 100.0
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) <= 4 * np.spacing(np.abs(scaled))
+    for i in np.flatnonzero(near_half).tolist():
+        rounded[i] = round(float(values[i]), 2)
+    return rounded.tolist()
 
 
 class AccountingSystem:
@@ -63,7 +52,8 @@ class AccountingSystem:
         self.employees.extend([director, t1, t2, t3, guard])
         print(f"  Кількість співробітників у системі: {len(self.employees)}")
 
-    def run_salary_process(self):
+    @staticmethod
+    def ask_bonus() -> float: #інтерактивне введення бонусу
         while True:
             try:
                 val = input("\n Введіть суму бонусу у гривнях: ")
@@ -71,36 +61,175 @@ class AccountingSystem:
                 if bonus < 0:
                     print(" Бонус не може бути меншим за нуль ")
                     continue
-                break
+                if not bonus < math.inf:  #nan чи inf
+                    print(" Введіть скінченне число")
+                    continue
+                return bonus
             except ValueError:
                 print(" Введіть нормальне число")
 
-        records = []
-        print("\n" + "=" * 60)
-        print(f"{'ПІБ':<20} | {'Посада':<15} | {'Нараховано':<10}")
-        print("=" * 60)
-
+    def iter_payroll(self, bonus: float) -> Iterator[tuple]: #розрахунок по одному працівнику, рядок за рядком
         for emp in self.employees:
             emp.bonus = bonus
             sal = emp.calculate_salary()
             total = sal + bonus
-
-            print(f"{emp.full_name:<20} | {emp.__class__.__name__:<15} | {total:.2f} грн")
-
-              records.append({
-                "ПІБ": emp.full_name,
-                "Посада": emp.__class__.__name__,
-                "Ставка": emp.base_salary,
-                "Бонус": bonus,
-                "До видачі": round(total, 2)
-              })
-
-        pd.DataFrame(records).to_csv('salaries.csv', index=False, encoding='utf-8')
-        print("=" * 60)
-        print(f"  Дані збережено у файл salaries.csv")
+            yield emp.full_name, emp.__class__.__name__, emp.base_salary, bonus, round(total, 2)
+
+    def iter_payroll_batch(self, bonus: float) -> Iterator[tuple]:
+        #працівники групуються за типом, формула кожного типу рахується одним виразом numpy над колонками
+        #ставки та стажу; рядки збираються з колонок без циклу по працівниках у python
+        employees = self.employees
+        types = list(map(type, employees))
+        groups: Dict[Type[Employee], List[int]] = {}
+        for i, emp_type in enumerate(types):
+            groups.setdefault(emp_type, []).append(i)
+
+        totals = np.empty(len(employees), dtype=np.float64)
+        for emp_type, positions in groups.items():
+            members = list(map(employees.__getitem__, positions))
+            columns = [np.fromiter(map(attrgetter(field), members), dtype=np.float64, count=len(members))
+                       for field in ('base_salary',) + emp_type.experience_fields]
+            salaries = emp_type.calculate_salaries(*columns)
+            totals[positions] = salaries + bonus
+            for emp, salary in zip(members, salaries.tolist()):  #об'єкти такі самі, як після поштучного розрахунку
+                emp.salary = salary
+                emp.bonus = bonus
+
+        names = map(attrgetter('full_name'), employees)
+        kinds = map(attrgetter('__name__'), types)
+        bases = map(attrgetter('base_salary'), employees)
+        return zip(names, kinds, bases, repeat(bonus), round_cents(totals))
+
+    @staticmethod
+    def _columns(rows: Iterable[tuple]) -> Dict[str, list]:
+        transposed = list(zip(*rows)) or [()] * len(PAYROLL_COLUMNS)
+        return {name: list(values) for name, values in zip(PAYROLL_COLUMNS, transposed)}
+
+    def payroll_columns(self, bonus: float) -> Dict[str, list]:
+        return self._columns(self.iter_payroll(bonus))
+
+    def payroll_columns_batch(self, bonus: float) -> Dict[str, list]:
+        return self._columns(self.iter_payroll_batch(bonus))
+
+    def calculate_payroll(self, bonus: float) -> pd.DataFrame:
+        return pd.DataFrame(self.payroll_columns(bonus), columns=PAYROLL_COLUMNS)
+
+    def calculate_payroll_batch(self, bonus: float) -> pd.DataFrame:
+        return pd.DataFrame(self.payroll_columns_batch(bonus), columns=PAYROLL_COLUMNS)
+
+    def run_salary_process(self, bonus: Optional[float] = None, batch: bool = False,
+                           output: str = 'salaries.csv', verbose: bool = True,
+                           ledger: Optional[PayrollLedger] = None, period: Optional[str] = None,
+                           on_rows: Optional[Callable[[int], None]] = None) -> int:
+        #рядки пишуться у файл одразу після розрахунку; output замінюється лише готовою відомістю,
+        #з ledger відомість ще й додається в журнал за period (типово - поточний місяць). Повертає к-сть рядків.
+        #on_rows(к-сть записаних рядків) викликається кожні PROGRESS_ROWS рядків; виняток з нього зупиняє
+        #розрахунок, і ні output, ні журнал не змінюються
+        if bonus is None:
+            bonus = self.ask_bonus()
+        elif not 0 <= bonus < math.inf:  #nan теж не проходить порівняння
+            raise ValueError(f"Бонус має бути невід'ємним скінченним числом, а не {bonus}")
+
+        with ExitStack() as stack:
+            #журнал відкривається першим: якщо період уже записано, salaries.csv не чіпається
+            writers = []
+            if ledger is not None:
+                writers.append(stack.enter_context(ledger.open_period(period or current_period(), PAYROLL_COLUMNS)))
+            writers.append(stack.enter_context(PayrollWriter(output, PAYROLL_COLUMNS)))
+
+            if verbose:
+                print("\n".join(["\n" + "=" * 60, f"{'ПІБ':<20} | {'Посада':<15} | {'Нараховано':<10}", "=" * 60]))
+            rows = self.iter_payroll_batch(bonus) if batch else self.iter_payroll(bonus)
+            count = 0
+            #рядки пишуться пакетами по PROGRESS_ROWS: один writerows на пакет замість виклику на кожен рядок
+            for block in iter(lambda: list(islice(rows, PROGRESS_ROWS)), []):
+                for writer in writers:
+                    writer.write_many(block)
+                if verbose:
+                    for row in block:
+                        print(f"{row[0]:<20} | {row[1]:<15} | {row[-1]:.2f} грн")
+                count += len(block)
+                if on_rows is not None and len(block) == PROGRESS_ROWS:
+                    on_rows(count)
+            if on_rows is not None:
+                on_rows(count)
+
+        if verbose:
+            print("=" * 60)
+            print(f"  Дані збережено у файл {output}")
+            if ledger is not None:
+                print(f"  Відомість додано в журнал {ledger.directory} за {period or current_period()}")
+        return count
+
+    def submit_salary_process(self, bonus: float, runner: Optional[jobs.JobRunner] = None, **kwargs) -> jobs.Job:
+        #відомість як фонова задача: прогрес - к-сть записаних рядків, Job.cancel зупиняє розрахунок
+        import jobs
+        if bonus is None:
+            raise ValueError("У фоні бонус не запитується, його треба задати одразу")
+        ledger = kwargs.get('ledger')
+        total = len(self.employees)
+
+        def work(job: jobs.Job) -> int:
+            job.report(0, total, "Розрахунок відомості")
+            return self.run_salary_process(bonus, verbose=False, on_rows=lambda done: job.report(done, total),
+                                           **kwargs)
+
+        #дві відомості в той самий файл чи журнал не пишуться одночасно
+        key = ledger.directory if ledger is not None else kwargs.get('output', 'salaries.csv')
+        return (runner or jobs.runner).submit("Відомість", work, key=key)
+
+
+def wait_with_progress(job: jobs.Job) -> jobs.JobSnapshot: #прогрес у stderr; Ctrl+C скасовує задачу
+    try:
+        while not job.wait(0.2).finished:
+            snapshot = job.snapshot()
+            print(f"\r  {snapshot.message}: {snapshot.done}/{snapshot.total}", end='', file=sys.stderr)
+    except KeyboardInterrupt:
+        job.cancel()
+    print(file=sys.stderr)
+    return job.wait()
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Розрахунок зарплат працівників ліцею")
+    parser.add_argument("--bonus", type=float, help="бонус у гривнях (без нього питає інтерактивно)")
+    parser.add_argument("--batch", action="store_true", help="пакетний розрахунок через numpy")
+    parser.add_argument("--output", default="salaries.csv", help="файл для збереження відомості")
+    parser.add_argument("--quiet", action="store_true", help="не друкувати відомість")
+    parser.add_argument("--ledger", help="каталог журналу відомостей (файл на кожен період)")
+    parser.add_argument("--period", help="період відомості в журналі, YYYY-MM (типово - поточний місяць)")
+    parser.add_argument("--background", action="store_true",
+                        help="рахувати у фоновій задачі з прогресом (Ctrl+C скасовує, потрібен --bonus)")
+    args = parser.parse_args()
+    if args.bonus is not None and not 0 <= args.bonus < math.inf:  #та сама перевірка, що й у run_salary_process
+        parser.error(f"--bonus має бути невід'ємним числом, а не {args.bonus}")
+    if args.background and args.bonus is None:
+        parser.error("--background потребує --bonus: у фоні бонус не запитується")
+    if args.period is not None and not PERIOD_RE.match(args.period):
+        parser.error(f"--period має бути у вигляді YYYY-MM, а не '{args.period}'")
+
     app = AccountingSystem()
     app.initialize_employees()
-    app.run_salary_process()
\ No newline at end of file
+    ledger = PayrollLedger(args.ledger) if args.ledger else None
+    try:
+        if args.background:
+            from jobs import CANCELLED, DONE
+            result = wait_with_progress(app.submit_salary_process(args.bonus, batch=args.batch, output=args.output,
+                                                                  ledger=ledger, period=args.period))
+            if result.status == DONE:
+                print(f"  {result.result} рядків збережено у файл {args.output} за {result.seconds:.2f} с")
+            elif result.status == CANCELLED:
+                print("  Розрахунок скасовано, відомість не змінено")
+            else:
+                print(f"  Помилка розрахунку: {result.error}")
+                sys.exit(1)
+        else:
+            try:
+                app.run_salary_process(bonus=args.bonus, batch=args.batch, output=args.output,
+                                       verbose=not args.quiet, ledger=ledger, period=args.period)
+            except FileExistsError as e:  #період уже в журналі: записані відомості не переписуються
+                print(f"  ❌ {e}")
+                sys.exit(1)
+    finally:
+        if ledger is not None:
+            ledger.close()
@@ -0,0 +1,58 @@
+"""Час імпорту доменних модулів (python -X importtime) з бюджетом у мілісекундах.
+
+Запуск: python benchmarks/bench_import.py [к-сть повторів]
+Повертає код 1, якщо модуль імпортується довше бюджету або тягне за собою важкі пакети.
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#модуль -> бюджет кумулятивного часу імпорту, мс
+BUDGETS = {
+    'lazy': 5,
+    'staff': 5,
+    'storage': 15,
+    'school': 25,
+    '2_scenario': 20,
+}
+#пакет вважається завантаженим, якщо виконався його підмодуль (лінивий модуль у sys.modules не рахується)
+HEAVY = {'numpy': 'numpy.linalg', 'pandas': 'pandas.core', 'matplotlib': 'matplotlib.figure',
+         'streamlit': 'streamlit.runtime'}
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def import_time(module: str) -> tuple: #(кумулятивний час імпорту в мс, завантажені важкі пакети)
+    code = (f"import json, sys; __import__({module!r}); "
+            f"print(json.dumps([p for p, sub in {HEAVY!r}.items() if sub in sys.modules]))")
+    env = {k: v for k, v in os.environ.items() if k != 'PYTHONDONTWRITEBYTECODE'}  #без .pyc міряли б компіляцію
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    cumulative = 0
+    for match in LINE.finditer(result.stderr):
+        if not match.group(3) and match.group(4) == module:
+            cumulative = int(match.group(2))
+    return cumulative / 1000, json.loads(result.stdout)
+
+
+def main(repeats: int = 5) -> int:
+    failed = 0
+    print(f"{'модуль':<12} {'мс':>8} {'бюджет':>8}  важкі пакети")
+    for module, budget in BUDGETS.items():
+        times, heavy = [], []
+        for _ in range(repeats):
+            ms, heavy = import_time(module)
+            times.append(ms)
+        best = min(times)  #мінімум з повторів менше залежить від шуму системи
+        ok = best <= budget and not heavy
+        failed += not ok
+        print(f"{module:<12} {best:8.1f} {budget:8d}  {', '.join(heavy) or '-'}{'' if ok else '  ❌'}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5))
@@ -0,0 +1,67 @@
+"""Пам'ять на одного учня: звичайний клас з __dict__, Student з __slots__ та StudentStore.
+
+Запуск: python benchmarks/bench_memory.py [к-сть учнів]
+"""
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from school import Student, StudentStore  # noqa: E402
+
+
+class DictStudent: #учень як до переходу на __slots__, для порівняння
+    def __init__(self, last_name, first_name, middle_name, birth_year, gender, average_grade):
+        self.last_name = last_name
+        self.first_name = first_name
+        self.middle_name = middle_name
+        self.birth_year = birth_year
+        self.gender = gender
+        self.average_grade = average_grade
+
+
+def make_frame(n: int, seed: int = 42) -> pd.DataFrame: #випадкові учні з повторюваними іменами
+    rng = np.random.default_rng(seed)
+    last = np.array([f"Прізвище{i}" for i in range(5000)], dtype=object)
+    first = np.array([f"Ім'я{i}" for i in range(300)], dtype=object)
+    middle = np.array([f"Побатькові{i}" for i in range(300)], dtype=object)
+    return pd.DataFrame({
+        'last_name': last[rng.integers(0, len(last), n)],
+        'first_name': first[rng.integers(0, len(first), n)],
+        'middle_name': middle[rng.integers(0, len(middle), n)],
+        'birth_year': rng.integers(2007, 2020, n).astype('int32'),
+        'gender': pd.Categorical(rng.choice(['Хлопець', 'Дівчина'], n)),
+        'average_grade': np.round(rng.uniform(1, 12, n), 1),
+    })
+
+
+def measure(build) -> int: #приріст пам'яті після побудови (рядки імен вже існують і не рахуються)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+
+def main(n: int) -> None:
+    frame = make_frame(n)
+    rows = list(zip(*(frame[name].tolist() for name in
+                      ['last_name', 'first_name', 'middle_name', 'birth_year', 'gender', 'average_grade'])))
+
+    results = {
+        "__dict__": measure(lambda: [DictStudent(*r) for r in rows]),
+        "__slots__": measure(lambda: [Student(*r) for r in rows]),
+        "StudentStore": measure(lambda: StudentStore.from_frame(frame)),
+    }
+    print(f"Учнів: {n}")
+    for name, size in results.items():
+        print(f"  {name:<14} {size / n:8.1f} байт/учня")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
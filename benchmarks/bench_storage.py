@@ -0,0 +1,39 @@
+"""Час завантаження School.load_data з csv, feather та parquet.
+
+Запуск: python benchmarks/bench_storage.py [к-сть учнів]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import storage  # noqa: E402
+from school import School  # noqa: E402
+from synthetic import make_students  # noqa: E402
+
+
+def main(n: int, repeats: int = 3) -> None:
+    classes = pd.DataFrame([{'parallel': p, 'vertical': v} for p in range(1, 12) for v in ['А', 'Б']])
+    students = make_students(n)
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Учнів: {n}")
+        for ext in ['csv', 'feather', 'parquet']:
+            classes_file = os.path.join(tmp, f"classes.{ext}")
+            students_file = os.path.join(tmp, f"students.{ext}")
+            storage.write_table(classes, classes_file)
+            storage.write_table(students, students_file)
+
+            best = float('inf')
+            for _ in range(repeats):
+                start = time.perf_counter()
+                School("bench").load_data(classes_file, students_file)
+                best = min(best, time.perf_counter() - start)
+            size = os.path.getsize(students_file) / 2 ** 20
+            print(f"  {ext:<8} {best * 1000:9.1f} мс  {size:7.1f} МБ")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
@@ -0,0 +1,197 @@
+"""Набір бенчмарків на синтетичних даних з історією результатів у JSON.
+
+Міряються School.load_data (цілком і потоково), get_all_students_data, агрегати display_statistics,
+promote_all_classes, розрахунок відомості (iter_payroll, поштучно й пакетно) та
+AccountingSystem.run_salary_process (без введення та друку).
+
+Запуск: python benchmarks/run_benchmarks.py [--students 1e3 1e4 1e5] [--employees 1e2 1e3 1e4]
+        [--repeats 3] [--history benchmarks/history.json] [--data-dir каталог] [--fail-on-regression]
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from school import STREAM_CHUNKSIZE, School  # noqa: E402
+from school_dashboard import DashboardSchool  # noqa: E402
+from synthetic import make_employees, write_roster  # noqa: E402
+
+scenario = importlib.import_module('2_scenario')  #ім'я модуля починається з цифри
+
+STUDENT_SIZES = (10 ** 3, 10 ** 7)  #межі розміру списку учнів
+EMPLOYEE_SIZES = (10 ** 2, 10 ** 6)
+REGRESSION_RATIO = 1.2  #у скільки разів повільніше за попередній запуск вважається регресією
+REGRESSION_MIN = 0.005  #різниця менше 5 мс - шум, а не регресія
+
+
+def best_of(repeats: int, run: Callable[[], None], setup: Optional[Callable[[], None]] = None) -> float:
+    #мінімум з кількох повторів менше залежить від шуму; setup не входить у час
+    best = float('inf')
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_roster(n: int, data_dir: str, seed: int, repeats: int) -> dict:
+    classes_file, students_file = write_roster(data_dir, n, seed)
+    results = {}
+    loaded: List[DashboardSchool] = []
+
+    def load(chunksize: Optional[int] = None):
+        school = DashboardSchool("bench")
+        School.load_data(school, classes_file, students_file, chunksize=chunksize)  #без st.error, помилки видно одразу
+        loaded[:] = [school]
+
+    results['load_data'] = best_of(repeats, load)
+    results['load_data_stream'] = best_of(repeats, lambda: load(STREAM_CHUNKSIZE))
+    school = loaded[0]
+
+    results['get_all_students_data'] = best_of(repeats, school.get_all_students_data,
+                                               setup=school._invalidate_students_table)
+
+    def statistics():  #те, що display_statistics та generate_visualizations читають перед малюванням
+        stats = school.stats
+        _ = (stats.total, dict(stats.genders), stats.largest_class(), stats.smallest_class(),
+             stats.mean_grade(), stats.grade_std())
+        school.chart_aggregates()
+
+    def reset_aggregates():
+        school._aggregates_key = None
+
+    results['display_statistics_aggregates'] = best_of(repeats, statistics, setup=reset_aggregates)
+
+    promoted = []
+
+    def rollback():
+        if promoted:
+            school.rollback_promotion()
+
+    def promote():
+        School.promote_all_classes(school)
+        promoted[:] = [True]
+
+    results['promote_all_classes'] = best_of(repeats, promote, setup=rollback)
+    return results
+
+
+def bench_payroll(m: int, data_dir: str, seed: int, repeats: int) -> dict:
+    app = scenario.AccountingSystem()
+    app.employees = make_employees(m, seed)
+    output = os.path.join(data_dir, f"salaries_{m}.csv")
+    return {
+        #лише розрахунок рядків, без запису: тут і видно різницю між поштучним і пакетним шляхом
+        'iter_payroll': best_of(repeats, lambda: list(app.iter_payroll(500.0))),
+        'iter_payroll_batch': best_of(repeats, lambda: list(app.iter_payroll_batch(500.0))),
+        'run_salary_process': best_of(repeats, lambda: app.run_salary_process(
+            bonus=500.0, output=output, verbose=False)),
+        'run_salary_process_batch': best_of(repeats, lambda: app.run_salary_process(
+            bonus=500.0, batch=True, output=output, verbose=False)),
+    }
+
+
+def git_commit() -> Optional[str]: #поточний коміт; '+' означає незакомічені зміни
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ('+' if dirty else '')
+
+
+def load_history(path: str) -> list:
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_history(path: str, history: list) -> None: #через тимчасовий файл, щоб не зіпсувати історію при збої
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(history, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+
+def previous_results(history: list, machine: str) -> dict: #останній час кожного бенчмарку на цій машині
+    last = {}
+    for run in history:
+        if run.get('machine') == machine:
+            for result in run['results']:
+                last[(result['benchmark'], result['size'])] = result['seconds']
+    return last
+
+
+def parse_sizes(values: List[str], bounds: tuple, parser: argparse.ArgumentParser, what: str) -> List[int]:
+    sizes = [int(float(v)) for v in values]  #дозволяє писати 1e5
+    for size in sizes:
+        if not bounds[0] <= size <= bounds[1]:
+            parser.error(f"{what}: {size} поза межами {bounds[0]}..{bounds[1]}")
+    return sizes
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарки школи та відомості на синтетичних даних")
+    parser.add_argument("--students", nargs='+', default=['1e3', '1e4', '1e5'], help="розміри списку учнів")
+    parser.add_argument("--employees", nargs='+', default=['1e2', '1e3', '1e4'], help="к-сть працівників")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--history", default=os.path.join(ROOT, 'benchmarks', 'history.json'))
+    parser.add_argument("--data-dir", help="каталог для згенерованих файлів (типово - тимчасовий)")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help=f"код 1, якщо щось повільніше за попередній запуск у {REGRESSION_RATIO} раза")
+    args = parser.parse_args()
+    students = parse_sizes(args.students, STUDENT_SIZES, parser, "--students")
+    employees = parse_sizes(args.employees, EMPLOYEE_SIZES, parser, "--employees")
+
+    history = load_history(args.history)
+    machine = f"{platform.node()} {platform.machine()} {os.cpu_count()} CPU"
+    previous = previous_results(history, machine)
+    results = []
+    regressions = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir or tmp
+        runs = [(n, bench_roster) for n in students] + [(m, bench_payroll) for m in employees]
+        print(f"{'бенчмарк':<32} {'розмір':>9} {'мс':>10} {'було':>10}")
+        for size, bench in runs:
+            for name, seconds in bench(size, data_dir, args.seed, args.repeats).items():
+                results.append({'benchmark': name, 'size': size, 'seconds': seconds})
+                before = previous.get((name, size))
+                mark = ''
+                if before is not None and seconds > max(before * REGRESSION_RATIO, before + REGRESSION_MIN):
+                    mark = '  ❌'
+                    regressions += 1
+                was = f"{before * 1000:10.1f}" if before is not None else f"{'-':>10}"
+                print(f"{name:<32} {size:>9} {seconds * 1000:10.1f} {was}{mark}")
+
+    history.append({
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'machine': machine,
+        'seed': args.seed,
+        'repeats': args.repeats,
+        'results': results,
+    })
+    save_history(args.history, history)
+    print(f"Результати додано в {args.history}")
+    return 1 if args.fail_on_regression and regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
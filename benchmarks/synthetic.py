@@ -0,0 +1,108 @@
+"""Відтворювані синтетичні дані у схемах classes.csv, students.csv та працівники для відомості.
+
+Запуск: python benchmarks/synthetic.py каталог к-сть_учнів [--seed N] [--format csv|feather|parquet]
+"""
+import argparse
+import math
+import os
+import sys
+from typing import Iterator, List
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import storage  # noqa: E402
+from staff import Director, Employee, SecurityGuard, Teacher  # noqa: E402
+
+LETTERS = list("АБВГДЕЄЖЗИІКЛМНОПРСТУФХЦЧШЮЯ")
+PARALLELS = range(1, 12)
+CLASS_SIZE = 30  #скільки учнів у середньому на клас при автоматичному виборі к-сті вертикалей
+CHUNK_ROWS = 1_000_000  #рядків за один запис великого students.csv
+SCHOOL_YEAR = 2025
+
+
+def vertical_names(n: int) -> List[str]: #А, Б, ... Я, потім А1, Б1, ...
+    return [LETTERS[i % len(LETTERS)] + (str(i // len(LETTERS)) if i >= len(LETTERS) else '') for i in range(n)]
+
+
+def verticals_for(n_students: int, class_size: int = CLASS_SIZE) -> List[str]:
+    return vertical_names(max(2, math.ceil(n_students / (len(PARALLELS) * class_size))))
+
+
+def make_classes(verticals: List[str]) -> pd.DataFrame:
+    return pd.DataFrame([{'parallel': p, 'vertical': v} for p in PARALLELS for v in verticals])
+
+
+def make_students(n: int, seed: int = 42, verticals: List[str] = ('А', 'Б')) -> pd.DataFrame:
+    #випадкові учні у схемі students.csv; той самий seed дає ту саму таблицю
+    rng = np.random.default_rng(seed)
+    parallel = rng.integers(1, 12, n)
+    return pd.DataFrame({
+        'last_name': np.array([f"Прізвище{i}" for i in range(5000)], dtype=object)[rng.integers(0, 5000, n)],
+        'first_name': np.array([f"Ім'я{i}" for i in range(300)], dtype=object)[rng.integers(0, 300, n)],
+        'middle_name': np.array([f"Побатькові{i}" for i in range(300)], dtype=object)[rng.integers(0, 300, n)],
+        'birth_year': SCHOOL_YEAR - 6 - parallel - (rng.random(n) < 0.1),  #кожен десятий на рік старший
+        'gender': rng.choice(['Хлопець', 'Дівчина'], n),
+        'average_grade': np.round(rng.uniform(1, 12, n), 1),
+        'class_parallel': parallel,
+        'class_vertical': np.asarray(verticals, dtype=object)[rng.integers(0, len(verticals), n)],
+    })
+
+
+def iter_students(n: int, seed: int = 42, verticals: List[str] = ('А', 'Б'),
+                  chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    #великий список частинами: кожна частина має свій seed, тож результат не залежить від пам'яті
+    for i, start in enumerate(range(0, n, chunk_rows)):
+        yield make_students(min(chunk_rows, n - start), seed=seed * 1_000_003 + i, verticals=verticals)
+
+
+def write_roster(directory: str, n: int, seed: int = 42, fmt: str = 'csv') -> tuple:
+    #записує classes та students і повертає шляхи; вже записані файли з тими ж параметрами перевикористовуються
+    verticals = verticals_for(n)
+    classes_file = os.path.join(directory, f"classes_{n}_{seed}.{fmt}")
+    students_file = os.path.join(directory, f"students_{n}_{seed}.{fmt}")
+    if os.path.exists(classes_file) and os.path.exists(students_file):
+        return classes_file, students_file
+    os.makedirs(directory, exist_ok=True)
+    if fmt == 'csv': #csv дописується частинами, щоб 10^7 учнів не тримати в пам'яті разом
+        tmp_path = students_file + '.tmp'
+        for i, chunk in enumerate(iter_students(n, seed, verticals)):
+            chunk.to_csv(tmp_path, mode='w' if i == 0 else 'a', header=i == 0, index=False, encoding='utf-8')
+        os.replace(tmp_path, students_file)
+    else:
+        storage.write_table(pd.concat(iter_students(n, seed, verticals), ignore_index=True), students_file)
+    storage.write_table(make_classes(verticals), classes_file)
+    return classes_file, students_file
+
+
+def make_employees(n: int, seed: int = 42) -> List[Employee]:
+    #на кожні 50 працівників один директор, кожен десятий - охоронець, решта - вчителі
+    rng = np.random.default_rng(seed)
+    kind = rng.random(n)
+    teaching = rng.integers(0, 40, n).tolist()
+    management = rng.integers(0, 20, n).tolist()
+    total = rng.integers(0, 30, n).tolist()
+    base = (np.round(rng.uniform(9000, 16000, n), -2)).tolist()
+    employees: List[Employee] = []
+    for i in range(n):
+        name = f"Працівник{i} {chr(ord('А') + i % 26)}.{chr(ord('А') + i // 26 % 26)}."
+        if kind[i] < 0.02:
+            employees.append(Director(name, base[i], teaching_experience=teaching[i],
+                                      management_experience=management[i]))
+        elif kind[i] < 0.12:
+            employees.append(SecurityGuard(name, base[i], total_experience=total[i]))
+        else:
+            employees.append(Teacher(name, base[i], teaching_experience=teaching[i]))
+    return employees
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Синтетичний список учнів у схемі classes/students")
+    parser.add_argument("directory", help="куди записати файли")
+    parser.add_argument("students", type=int, help="к-сть учнів")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--format", choices=sorted(set(storage.FORMATS.values())), default='csv')
+    args = parser.parse_args()
+    for path in write_roster(args.directory, args.students, args.seed, args.format):
+        print(f"✅ {path}")
@@ -0,0 +1,161 @@
+import hashlib
+import io
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+import numpy as np
+from matplotlib.figure import Figure
+
+
+#графіки малюються через Figure без pyplot: немає глобального стану, тож їх можна рендерити в потоках
+CHART_WORKERS = min(4, os.cpu_count() or 1)
+CHART_CACHE_SIZE = 256  #скільки готових картинок тримати в пам'яті
+FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+
+
+def aggregates_hash(data: dict) -> str: #хеш даних, з яких малюється графік
+    digest = hashlib.sha256()
+    for name in sorted(data):
+        value = data[name]
+        digest.update(name.encode())
+        if isinstance(value, np.ndarray):
+            digest.update(f"{value.dtype.str}{value.shape}".encode())
+            digest.update(np.ascontiguousarray(value).tobytes())
+        else:
+            digest.update(pickle.dumps(value, protocol=4))
+    return digest.hexdigest()
+
+
+def figure_bytes(fig: Figure, fmt: str = 'png') -> bytes:
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, bbox_inches='tight')
+    fig.clear()  #фігура не зареєстрована в pyplot, після очистки її звільнить збирач сміття
+    return buf.getvalue()
+
+
+class ChartRenderer: #рендер графіків у пулі потоків з кешем картинок за хешем даних
+    def __init__(self, max_workers: int = CHART_WORKERS, cache_size: int = CHART_CACHE_SIZE):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='charts')
+        self._cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._pending: dict = {}  #ключ -> Future графіка, що саме малюється
+        self._lock = threading.Lock()
+        self.cache_size = cache_size
+        self.rendered = 0  #скільки разів графік справді малювався (для перевірки кешу)
+
+    def render(self, draw: Callable[..., Figure], data: dict, fmt: str = 'png') -> "Future[bytes]":
+        #одразу повертає Future; однакові дані не малюються вдруге, навіть якщо запит прийшов під час рендеру
+        if fmt not in FORMATS:
+            raise ValueError(f"Невідомий формат графіка: {fmt}")
+        key = (draw.__module__, draw.__qualname__, fmt, aggregates_hash(data))
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                done: Future = Future()
+                done.set_result(self._cache[key])
+                return done
+            if key in self._pending:
+                return self._pending[key]
+            future = self._pool.submit(self._draw, draw, data, fmt)
+            self._pending[key] = future
+        future.add_done_callback(lambda f: self._store(key, f))
+        return future
+
+    def _draw(self, draw: Callable[..., Figure], data: dict, fmt: str) -> bytes:
+        image = figure_bytes(draw(**data), fmt)
+        self.rendered += 1
+        return image
+
+    def _store(self, key: tuple, future: Future) -> None:
+        with self._lock:
+            self._pending.pop(key, None)
+            if future.cancelled() or future.exception() is not None:
+                return  #помилку побачить той, хто чекає на Future; в кеш нічого не йде
+            self._cache[key] = future.result()
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+renderer = ChartRenderer()  #спільний для всіх сесій streamlit процесу
+
+
+def draw_class_counts(names: List[str], counts: np.ndarray) -> Figure:
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    ax.bar(names, counts, color='royalblue', edgecolor='black')
+    ax.set_ylabel("Кількість учнів")
+    ax.set_title("Кількість учнів у кожному класі")
+    ax.set_ylim(0, (counts.max() if len(counts) else 0) + 2)  # Трохи місця зверху
+    ax.tick_params(axis='x', labelrotation=45)  # Повертаємо підписи, щоб не злипалися
+    return fig
+
+
+def draw_bars(labels: list, values: np.ndarray, color: str, xlabel: str, ylabel: str,
+              figsize: tuple = (8, 4)) -> Figure: #стовпчики з підписами як у DataFrame.plot(kind='bar')
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots()
+    ax.bar(range(len(values)), values, color=color, width=0.5)
+    ax.set_xticks(range(len(values)))
+    ax.set_xticklabels([str(label) for label in labels], rotation=90)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    return fig
+
+
+def _grade_axes(fig: Figure, labels: List[str]):
+    ax = fig.subplots()
+    ax.set_xticks(range(len(labels)))
+    ax.set_xticklabels(labels, rotation=90)
+    ax.set_xlabel("Клас")
+    ax.set_ylabel("Середній бал")
+    return ax
+
+
+def draw_grades_scatter(labels: List[str], positions: np.ndarray, grades: np.ndarray) -> Figure:
+    fig = Figure(figsize=(10, 5))
+    ax = _grade_axes(fig, labels)
+    ax.scatter(positions, grades, alpha=0.5, c='purple')
+    return fig
+
+
+def draw_grades_box(labels: List[str], box_stats: List[dict]) -> Figure:
+    fig = Figure(figsize=(10, 5))
+    ax = _grade_axes(fig, labels)
+    ax.bxp(box_stats, positions=range(len(labels)), showfliers=False, patch_artist=True,
+           boxprops={'facecolor': 'plum'})
+    ax.set_xticks(range(len(labels)))  #bxp перезаписує підписи, повертаємо назви класів
+    ax.set_xticklabels(labels, rotation=90)
+    return fig
+
+
+def draw_grades_mean(labels: List[str], means: np.ndarray, stds: np.ndarray) -> Figure:
+    #середній бал класу з відхиленням; порожні класи (NaN) просто не малюються
+    fig = Figure(figsize=(10, 5))
+    ax = _grade_axes(fig, labels)
+    ax.errorbar(range(len(labels)), means, yerr=stds, fmt='o', color='purple', ecolor='plum', capsize=3)
+    return fig
+
+
+def draw_grades_density(labels: List[str], counts: np.ndarray, grade_bins: np.ndarray) -> Figure:
+    #counts - уже пораховані np.histogram2d клітинки (клас x бал), тут лише малювання
+    fig = Figure(figsize=(10, 5))
+    ax = _grade_axes(fig, labels)
+    class_edges = np.arange(len(labels) + 1) - 0.5
+    image = ax.pcolormesh(class_edges, grade_bins, np.ma.masked_less(counts.T, 1), cmap='Purples')
+    fig.colorbar(image, ax=ax, label="Кількість учнів")
+    return fig
+
+
+def grade_density(positions: np.ndarray, grades: np.ndarray, n_classes: int,
+                  grade_bins: Optional[np.ndarray] = None) -> dict: #дані для draw_grades_density
+    if grade_bins is None:
+        grade_bins = np.linspace(0, 12, 25)
+    counts, _, _ = np.histogram2d(positions, grades, bins=[np.arange(n_classes + 1) - 0.5, grade_bins])
+    return {'counts': counts.astype(np.int64), 'grade_bins': grade_bins}
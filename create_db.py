@@ -1,8 +1,12 @@
+import argparse
 import pandas as pd
 import os
 
+import storage
 
-def create_database():
+
+def create_database(classes_file: str = 'classes.csv', students_file: str = 'students.csv'):
+    # Формат (csv, feather, parquet) визначається за розширенням файлу
     print("⏳ Починаємо створення файлів...")
 
     # ==========================================
@@ -17,9 +21,9 @@ def create_database():
 
     # Створюємо DataFrame і зберігаємо
     df_classes = pd.DataFrame(classes_data)
-    df_classes.to_csv('classes.csv', index=False, encoding='utf-8')
+    storage.write_table(df_classes, classes_file)
 
-    print(f"✅ Файл 'classes.csv' успішно створено!")
+    print(f"✅ Файл '{classes_file}' успішно створено!")
     print(f"   -> Всього класів: {len(df_classes)}")
     print(f"   -> Приклад: {classes_data[:2]} ... {classes_data[-2:]}")
 
@@ -106,13 +110,17 @@ def create_database():
     ]
 
     df_students = pd.DataFrame(students_data, columns=columns)
-    df_students.to_csv('students.csv', index=False, encoding='utf-8')
+    storage.write_table(df_students, students_file)
 
-    print(f"✅ Файл 'students.csv' успішно створено!")
+    print(f"✅ Файл '{students_file}' успішно створено!")
     print(f"   -> Всього учнів: {len(df_students)}")
 
     print("\n🎉 ГОТОВО! Тепер запускай головний файл.")
 
 
 if __name__ == "__main__":
-    create_database()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Створення файлів класів та учнів")
+    parser.add_argument("--format", choices=['csv', 'feather', 'parquet'], default='csv',
+                        help="формат файлів (розширення classes/students)")
+    args = parser.parse_args()
+    create_database(f"classes.{args.format}", f"students.{args.format}")
\ No newline at end of file
@@ -0,0 +1,172 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import storage
+from school import STREAM_CHUNKSIZE, School
+
+
+class SchoolSource: #файли однієї школи району
+    __slots__ = ('name', 'classes_file', 'students_file')
+
+    def __init__(self, name: str, classes_file: str, students_file: str):
+        self.name = name
+        self.classes_file = classes_file
+        self.students_file = students_file
+
+
+class SchoolSummary: #компактні показники школи колонками numpy, саме вони передаються між процесами
+    def __init__(self, name: str):
+        self.name = name
+        self.total = 0
+        self.genders: Dict[str, int] = {}
+        self.class_parallel = np.empty(0, dtype=np.int16)
+        self.class_vertical: List[str] = []
+        self.class_count = np.empty(0, dtype=np.int64)
+        self.class_grade_sum = np.empty(0, dtype=np.float64)
+        self.class_grade_sumsq = np.empty(0, dtype=np.float64)
+        self.birth_years = np.empty(0, dtype=np.int32)
+        self.birth_counts = np.empty(0, dtype=np.int64)
+        self.load_errors = 0
+        self.error: Optional[str] = None  #текст помилки, якщо школу не вдалося завантажити
+
+    @classmethod
+    def from_school(cls, school: School) -> "SchoolSummary":
+        summary = cls(school.name)
+        classes = school.ordered_classes()
+        summary.total = school.stats.total
+        summary.genders = dict(school.stats.genders)
+        summary.class_parallel = np.array([c.parallel for c in classes], dtype=np.int16)
+        summary.class_vertical = [str(c.vertical) for c in classes]
+        summary.class_count = np.array([c.stats.count for c in classes], dtype=np.int64)
+        summary.class_grade_sum = np.array([c.stats.grade_sum for c in classes], dtype=np.float64)
+        summary.class_grade_sumsq = np.array([c.stats.grade_sumsq for c in classes], dtype=np.float64)
+        birth = school.rollup('birth_year')
+        summary.birth_years = np.array([year for (year,) in birth], dtype=np.int32)
+        summary.birth_counts = np.array([cell[0] for cell in birth.values()], dtype=np.int64)
+        summary.load_errors = len(school.load_errors)
+        return summary
+
+
+def summarize_school(source: SchoolSource, chunksize: int = STREAM_CHUNKSIZE) -> SchoolSummary:
+    #виконується у процесі-працівнику: школа будується там, назад повертаються лише масиви показників
+    try:
+        #учні для зведення не потрібні: зі свіжим students.rollup.json файл учнів навіть не читається
+        school = School(source.name)
+        school.load_data(source.classes_file, source.students_file, chunksize, keep_students=False, rollup_cache=True)
+        return SchoolSummary.from_school(school)
+    except Exception as e:
+        summary = SchoolSummary(source.name)
+        summary.error = f"{type(e).__name__}: {e}"
+        return summary
+
+
+class District: #район: багато шкіл, що завантажуються паралельно в окремих процесах
+    def __init__(self, name: str, sources: List[SchoolSource]):
+        self.name = name
+        self.sources = sources
+        self.summaries: List[SchoolSummary] = []
+
+    @classmethod
+    def from_manifest(cls, name: str, manifest_file: str) -> "District":
+        #таблиця з колонками name, classes_file, students_file; шляхи відносно самої таблиці
+        manifest = storage.read_table(manifest_file)
+        base = os.path.dirname(os.path.abspath(manifest_file))
+        sources = [SchoolSource(n, os.path.join(base, c), os.path.join(base, s)) for n, c, s in
+                   zip(manifest['name'], manifest['classes_file'], manifest['students_file'])]
+        return cls(name, sources)
+
+    def load(self, max_workers: Optional[int] = None, chunksize: int = STREAM_CHUNKSIZE) -> List[SchoolSummary]:
+        #max_workers=1 - усе в поточному процесі, без накладних витрат на пул
+        if max_workers == 1:
+            self.summaries = [summarize_school(source, chunksize) for source in self.sources]
+            return self.summaries
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            #результати в порядку таблиці шкіл, навіть якщо назви шкіл повторюються
+            futures = [pool.submit(summarize_school, source, chunksize) for source in self.sources]
+            self.summaries = [future.result() for future in futures]
+        return self.summaries
+
+    def failed(self) -> List[Tuple[str, str]]: #(школа, помилка)
+        return [(s.name, s.error) for s in self.summaries if s.error is not None]
+
+    def _loaded(self) -> List[SchoolSummary]:
+        return [s for s in self.summaries if s.error is None]
+
+    def totals(self) -> dict: #показники району зі зведень шкіл
+        loaded = self._loaded()
+        genders: Dict[str, int] = {}
+        for s in loaded:
+            for gender, count in s.genders.items():
+                genders[gender] = genders.get(gender, 0) + count
+        total = sum(s.total for s in loaded)
+        grade_sum = float(sum(s.class_grade_sum.sum() for s in loaded))
+        grade_sumsq = float(sum(s.class_grade_sumsq.sum() for s in loaded))
+        mean = grade_sum / total if total else 0.0
+        return {
+            'schools': len(loaded),
+            'classes': sum(len(s.class_count) for s in loaded),
+            'total': total,
+            'genders': genders,
+            'mean_grade': mean,
+            'grade_std': float(np.sqrt(max(grade_sumsq / total - mean * mean, 0.0))) if total else 0.0,
+            'load_errors': sum(s.load_errors for s in loaded),
+        }
+
+    def classes_frame(self) -> pd.DataFrame: #усі класи району однією таблицею
+        loaded = self._loaded()
+        if not loaded:
+            return pd.DataFrame(columns=['school', 'parallel', 'vertical', 'count', 'grade_sum', 'grade_sumsq'])
+        return pd.DataFrame({
+            'school': np.repeat([s.name for s in loaded], [len(s.class_count) for s in loaded]),
+            'parallel': np.concatenate([s.class_parallel for s in loaded]),
+            'vertical': np.concatenate([s.class_vertical for s in loaded]),
+            'count': np.concatenate([s.class_count for s in loaded]),
+            'grade_sum': np.concatenate([s.class_grade_sum for s in loaded]),
+            'grade_sumsq': np.concatenate([s.class_grade_sumsq for s in loaded]),
+        })
+
+    def counts_per_parallel(self) -> pd.Series:
+        return self.classes_frame().groupby('parallel')['count'].sum()
+
+    def counts_per_birth_year(self) -> pd.Series:
+        loaded = self._loaded()
+        if not loaded:
+            return pd.Series(dtype=np.int64)
+        years = np.concatenate([s.birth_years for s in loaded])
+        counts = np.concatenate([s.birth_counts for s in loaded])
+        return pd.Series(counts, index=years).groupby(level=0).sum()
+
+    def mean_vertical_size(self) -> pd.Series:
+        return self.classes_frame().groupby('vertical')['count'].mean()
+
+    def largest_classes(self, n: int = 5) -> pd.DataFrame:
+        return self.classes_frame().nlargest(n, 'count')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Показники району: паралельне завантаження шкіл")
+    parser.add_argument("manifest", help="таблиця шкіл з колонками name, classes_file, students_file")
+    parser.add_argument("--name", default="Район", help="назва району")
+    parser.add_argument("--workers", type=int, default=None, help="к-сть процесів (типово - к-сть ядер)")
+    parser.add_argument("--chunksize", type=int, default=STREAM_CHUNKSIZE, help="рядків за одне читання")
+    args = parser.parse_args()
+
+    district = District.from_manifest(args.name, args.manifest)
+    start = time.perf_counter()
+    district.load(max_workers=args.workers, chunksize=args.chunksize)
+    elapsed = time.perf_counter() - start
+
+    totals = district.totals()
+    print(f"{district.name}: {totals['schools']} шкіл, {totals['classes']} класів, {totals['total']} учнів "
+          f"за {elapsed:.2f} с")
+    print(f"  За статтю: {totals['genders']}")
+    print(f"  Середній бал: {totals['mean_grade']:.2f} ± {totals['grade_std']:.2f}")
+    print(f"  По паралелях: {district.counts_per_parallel().to_dict()}")
+    for name, error in district.failed():
+        print(f"  ❌ {name}: {error}")
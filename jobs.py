@@ -0,0 +1,202 @@
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+
+#довгі операції (переведення, відомість) виконуються в пулі потоків, а інтерфейс лише опитує їх стан
+JOB_WORKERS = min(4, (os.cpu_count() or 1) + 1)  #хоча б два: одна довга задача не блокує решту
+KEEP_FINISHED = 100  #скільки завершених задач пам'ятати для опитування
+
+PENDING, RUNNING, DONE, FAILED, CANCELLED = 'pending', 'running', 'done', 'failed', 'cancelled'
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception): #кидається з Job.report, коли задачу скасовано; функція задачі її не ловить
+    pass
+
+
+class JobSnapshot: #незмінний стан задачі на момент опитування
+    __slots__ = ('id', 'name', 'key', 'status', 'done', 'total', 'message', 'result', 'error', 'seconds')
+
+    def __init__(self, job: 'Job'):
+        self.id = job.id
+        self.name = job.name
+        self.key = job.key
+        self.status = job.status
+        self.done = job.done
+        self.total = job.total
+        self.message = job.message
+        self.result = job.result
+        self.error = job.error
+        end = job.finished if job.finished is not None else time.perf_counter()
+        self.seconds = end - job.started if job.started is not None else 0.0
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    @property
+    def fraction(self) -> float: #частка виконаного для st.progress
+        if self.status == DONE:
+            return 1.0
+        return min(self.done / self.total, 1.0) if self.total else 0.0
+
+
+class Job:
+    def __init__(self, job_id: int, name: str, key: Optional[str]):
+        self.id = job_id
+        self.name = name
+        self.key = key
+        self.status = PENDING
+        self.done = 0
+        self.total = 0
+        self.message = ''
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.future: Optional[Future] = None  #None, поки задача чекає в черзі свого key
+        self._call: Optional[tuple] = None  #(func, args, kwargs) до запуску
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    def report(self, done: int, total: Optional[int] = None, message: Optional[str] = None) -> None:
+        #викликається з функції задачі; це ж і місце, де задача помічає скасування
+        if self._cancel.is_set():
+            raise JobCancelled(self.name)
+        with self._lock:
+            self.done = done
+            if total is not None:
+                self.total = total
+            if message is not None:
+                self.message = message
+
+    def cancel(self) -> None: #задача, що ще не почалася, просто не запуститься, а та, що йде, зупиниться на report
+        self._cancel.set()
+        if self.status == PENDING and (self.future is None or self.future.cancel()):
+            self._finish(CANCELLED)
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    def snapshot(self) -> JobSnapshot:
+        with self._lock:
+            return JobSnapshot(self)
+
+    def wait(self, timeout: Optional[float] = None) -> JobSnapshot: #після таймауту стан видно у знімку
+        self._done.wait(timeout)
+        return self.snapshot()
+
+    def _start(self) -> None:
+        with self._lock:
+            self.status = RUNNING
+            self.started = time.perf_counter()
+
+    def _finish(self, status: str, result: Any = None, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            if self.status in FINISHED:  #скасовану в черзі задачу ще раз завершує _run
+                return
+            self.status = status
+            self.result = result
+            self.error = error
+            self.finished = time.perf_counter()
+            if self.started is None:
+                self.started = self.finished
+        self._done.set()
+
+
+class JobRunner: #пул фонових задач; задачі з однаковим key (наприклад, одна школа) виконуються по черзі
+    def __init__(self, max_workers: int = JOB_WORKERS, keep_finished: int = KEEP_FINISHED):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='jobs')
+        self._jobs: Dict[int, Job] = {}
+        #черги задач за key: перша задача черги вже в пулі, наступна потрапляє туди лише після її завершення,
+        #тож задачі, що чекають, не займають потоків пулу
+        self._queues: Dict[str, Deque[Job]] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()  #add_done_callback для вже завершеної задачі викликає _next одразу, під цим же замком
+        self._closed = False
+        self.keep_finished = keep_finished
+
+    def submit(self, name: str, func: Callable[..., Any], *args, key: Optional[str] = None, **kwargs) -> Job:
+        #func(job, *args, **kwargs): job.report(done, total) повідомляє прогрес і перериває скасовану задачу
+        with self._lock:
+            job = Job(next(self._ids), name, key)
+            job._call = (func, args, kwargs)
+            self._jobs[job.id] = job
+            self._prune()
+            if key is not None:
+                queue = self._queues.setdefault(key, deque())
+                queue.append(job)
+                if len(queue) > 1:  #задача з цим key вже виконується
+                    return job
+            self._launch(job)
+        return job
+
+    def _launch(self, job: Job) -> None: #викликається під self._lock
+        job.future = self._pool.submit(self._run, job)
+        if job.key is not None:
+            job.future.add_done_callback(lambda future, key=job.key: self._next(key))
+
+    def _next(self, key: str) -> None: #задача з key завершилась (чи скасована в пулі) - запускається наступна
+        with self._lock:
+            queue = self._queues[key]
+            queue.popleft()
+            while queue and (queue[0].status in FINISHED or self._closed):
+                queue[0]._finish(CANCELLED)
+                queue.popleft()
+            if queue:
+                self._launch(queue[0])
+            else:
+                del self._queues[key]
+
+    def _run(self, job: Job) -> Any:
+        func, args, kwargs = job._call
+        job._call = None
+        if job.cancel_requested:
+            job._finish(CANCELLED)
+            return None
+        job._start()
+        try:
+            result = func(job, *args, **kwargs)
+        except JobCancelled:
+            job._finish(CANCELLED)
+            return None
+        except Exception as e:
+            job._finish(FAILED, error=e)
+            raise
+        job._finish(DONE, result=result)
+        return result
+
+    def _prune(self) -> None: #найстаріші завершені задачі забуваються
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED]
+        for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: int) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, key: Optional[str] = None) -> List[JobSnapshot]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job.snapshot() for job in jobs if key is None or job.key == key]
+
+    def shutdown(self, cancel: bool = True) -> None:
+        with self._lock:
+            self._closed = cancel  #задачі з черг key більше не запускаються
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            if cancel:
+                job.cancel()
+            else:  #задачі з черг запускаються з пулу, тож він закривається, коли всі вони завершаться
+                job.wait()
+        self._pool.shutdown(wait=True)
+
+
+runner = JobRunner()  #спільний для всіх сесій streamlit, як і пул рендеру графіків
@@ -0,0 +1,259 @@
+import argparse
+import csv
+import itertools
+import os
+import re
+import sqlite3
+from datetime import date
+from typing import Iterable, List, Sequence, Tuple
+
+FLUSH_ROWS = 1000  #через скільки рядків записане віддається ОС: при збої в .part лишаються майже всі рядки
+BUFFER_SIZE = 1 << 16
+PART_SUFFIX = '.part'  #недописаний файл; під свою назву він потрапляє лише цілим
+PERIOD_RE = re.compile(r'^\d{4}-(0[1-9]|1[0-2])$')  #період - місяць, YYYY-MM
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS periods (
+    period TEXT PRIMARY KEY,
+    rows INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+-- виплати кластеризовані за працівником: вся історія одного ПІБ - один пошук у B-дереві
+CREATE TABLE IF NOT EXISTS payouts (
+    employee TEXT NOT NULL,
+    period TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    total REAL NOT NULL,
+    PRIMARY KEY (employee, period, offset)
+) WITHOUT ROWID;
+"""
+
+
+def current_period() -> str:
+    return date.today().strftime('%Y-%m')
+
+
+class _Line: #csv.writer віддає сюди рядок цілком, тож відомо, скільки байтів він займе у файлі
+    __slots__ = ('text',)
+
+    def __init__(self):
+        self.text = ''
+
+    def write(self, text: str) -> None:
+        self.text = text
+
+
+class _Lines(list): #те саме для writerows: рядки пакета по одному
+    write = list.append
+
+
+class PayrollWriter: #потоковий запис відомості: рядки йдуть у файл одразу, а не після розрахунку всіх
+    def __init__(self, path: str, header: Sequence[str], flush_rows: int = FLUSH_ROWS,
+                 buffer_size: int = BUFFER_SIZE):
+        self.path = path
+        self.part_path = path + PART_SUFFIX
+        self.flush_rows = flush_rows
+        self.rows = 0
+        self.offset = 0  #байт, з якого почнеться наступний рядок
+        self._line = _Line()
+        #lineterminator як у DataFrame.to_csv, тож файл той самий, що й раніше
+        self._writer = csv.writer(self._line, lineterminator=os.linesep)
+        self._file = open(self.part_path, 'wb', buffering=buffer_size)
+        self._write(header)
+
+    def _write(self, row: Iterable) -> int:
+        self._writer.writerow(row)
+        data = self._line.text.encode('utf-8')
+        offset = self.offset
+        self._file.write(data)
+        self.offset += len(data)
+        return offset
+
+    def write(self, row: Sequence) -> int: #повертає зсув рядка у файлі
+        offset = self._write(row)
+        self._advance(1)
+        return offset
+
+    def write_many(self, rows: Iterable[Sequence]) -> List[int]:
+        #пакет рядків одним викликом csv.writer.writerows; повертає зсуви рядків у файлі
+        lines = _Lines()
+        csv.writer(lines, lineterminator=os.linesep).writerows(rows)
+        data = [line.encode('utf-8') for line in lines]
+        offsets = list(itertools.accumulate(map(len, data), initial=self.offset))
+        self._file.write(b''.join(data))
+        self.offset = offsets.pop()
+        self._advance(len(data))
+        return offsets
+
+    def _advance(self, rows: int) -> None: #записане віддається ОС щоразу, як пройдено ще flush_rows рядків
+        before = self.rows
+        self.rows += rows
+        if self.rows // self.flush_rows > before // self.flush_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def commit(self) -> None:
+        #fsync перед перейменуванням: під назвою path не може опинитися файл з недописаним хвостом
+        self.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.part_path, self.path)
+
+    def abort(self) -> None: #записані рядки лишаються в .part, попередній файл path не чіпається
+        self._file.close()
+
+    def __enter__(self) -> 'PayrollWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+
+class Payout: #одна виплата з журналу; сам рядок читається через PayrollLedger.read_row
+    __slots__ = ('employee', 'period', 'offset', 'total')
+
+    def __init__(self, employee: str, period: str, offset: int, total: float):
+        self.employee = employee
+        self.period = period
+        self.offset = offset
+        self.total = total
+
+    def __repr__(self) -> str:
+        return f"Payout({self.employee!r}, {self.period}, {self.total:.2f})"
+
+
+class LedgerWriter(PayrollWriter): #запис відомості за період разом з індексом виплат
+    def __init__(self, ledger: 'PayrollLedger', period: str, header: Sequence[str], **kwargs):
+        super().__init__(ledger.period_path(period), header, **kwargs)
+        self.ledger = ledger
+        self.period = period
+        self._payouts: List[Tuple[str, str, int, float]] = []
+
+    def write(self, row: Sequence) -> int:
+        #ПІБ - перша колонка, сума до видачі - остання
+        offset = super().write(row)
+        self._payouts.append((str(row[0]), self.period, offset, float(row[-1])))
+        return offset
+
+    def write_many(self, rows: Iterable[Sequence]) -> List[int]:
+        rows = list(rows)
+        offsets = super().write_many(rows)
+        self._payouts.extend((str(row[0]), self.period, offset, float(row[-1])) for row, offset in zip(rows, offsets))
+        return offsets
+
+    def flush(self) -> None:
+        super().flush()
+        #індекс пишеться в ту саму незавершену транзакцію, вона фіксується лише після перейменування
+        self.ledger._add_payouts(self._payouts)
+        self._payouts.clear()
+
+    def commit(self) -> None:
+        super().commit()
+        self.ledger._finish_period(self.period, self.rows, self.offset)
+
+    def abort(self) -> None:
+        super().abort()
+        self.ledger.conn.rollback()
+
+
+class PayrollLedger: #журнал відомостей: файл на кожен період, раз записаний період не переписується
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        #журнал може писатися з фонової задачі (jobs); одночасно з ним працює лише одна задача
+        self.conn = sqlite3.connect(os.path.join(directory, 'index.sqlite'), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(INDEX_SCHEMA)
+        self._recover()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def period_path(self, period: str) -> str:
+        if not PERIOD_RE.match(period):
+            raise ValueError(f"Період має бути у вигляді YYYY-MM, а не '{period}'")
+        return os.path.join(self.directory, f"{period}.csv")
+
+    def periods(self) -> List[str]:
+        return [period for (period,) in self.conn.execute("SELECT period FROM periods ORDER BY period")]
+
+    def open_period(self, period: str, header: Sequence[str], **kwargs) -> LedgerWriter:
+        path = self.period_path(period)
+        if os.path.exists(path):
+            raise FileExistsError(f"Відомість за {period} вже є в журналі ({path})")
+        return LedgerWriter(self, period, header, **kwargs)
+
+    def _add_payouts(self, payouts: List[Tuple[str, str, int, float]]) -> None:
+        self.conn.executemany("INSERT OR REPLACE INTO payouts(employee, period, offset, total) VALUES (?, ?, ?, ?)",
+                              payouts)
+
+    def _finish_period(self, period: str, rows: int, size: int) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO periods(period, rows, size) VALUES (?, ?, ?)", (period, rows, size))
+        self.conn.commit()
+
+    def _index_file(self, period: str) -> None:
+        #переіндексація одного файлу (зсуви рахуються по байтах рядків, як при записі)
+        path = self.period_path(period)
+        payouts = []
+        rows = 0
+        with open(path, 'rb') as f:
+            offset = len(f.readline())  #заголовок
+            for line in f:
+                row = next(csv.reader([line.decode('utf-8')]))
+                payouts.append((row[0], period, offset, float(row[-1])))
+                offset += len(line)
+                rows += 1
+        self.conn.execute("DELETE FROM payouts WHERE period = ?", (period,))
+        self._add_payouts(payouts)
+        self._finish_period(period, rows, offset)
+
+    def _recover(self) -> None:
+        #файл перейменовано, а індекс зафіксувати не встигли - такий період індексується заново
+        indexed = set(self.periods())
+        for name in sorted(os.listdir(self.directory)):
+            period, ext = os.path.splitext(name)
+            if ext == '.csv' and PERIOD_RE.match(period) and period not in indexed:
+                self._index_file(period)
+
+    def rebuild_index(self) -> None:
+        self.conn.execute("DELETE FROM payouts")
+        self.conn.execute("DELETE FROM periods")
+        self.conn.commit()
+        self._recover()
+
+    def payouts(self, employee: str) -> List[Payout]: #усі виплати працівника без читання файлів відомостей
+        return [Payout(employee, period, offset, total) for period, offset, total in self.conn.execute(
+            "SELECT period, offset, total FROM payouts WHERE employee = ? ORDER BY period, offset", (employee,))]
+
+    def read_row(self, payout: Payout) -> List[str]: #повний рядок відомості: один seek у файлі періоду
+        with open(self.period_path(payout.period), 'rb') as f:
+            f.seek(payout.offset)
+            return next(csv.reader([f.readline().decode('utf-8')]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Історія виплат працівника з журналу відомостей")
+    parser.add_argument("directory", help="каталог журналу")
+    parser.add_argument("employee", nargs='?', help="ПІБ працівника (без нього - список періодів)")
+    parser.add_argument("--rows", action="store_true", help="показати рядки відомості повністю")
+    parser.add_argument("--rebuild", action="store_true", help="перебудувати індекс з файлів періодів")
+    args = parser.parse_args()
+
+    ledger = PayrollLedger(args.directory)
+    if args.rebuild:
+        ledger.rebuild_index()
+    if args.employee is None:
+        for period in ledger.periods():
+            print(period)
+    else:
+        found = ledger.payouts(args.employee)
+        if not found:
+            print(f"❌ Виплат для {args.employee} немає")
+        for payout in found:
+            print(f"{payout.period}: {payout.total:.2f} грн" + (f"  {ledger.read_row(payout)}" if args.rows else ''))
+    ledger.close()
@@ -0,0 +1,203 @@
+import cProfile
+import functools
+import io
+import marshal
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+
+#заміри вмикаються лише всередині recording(); без нього декоратор - це одна перевірка і виклик функції
+_local = threading.local()  #streamlit виконує кожну сесію в окремому потоці, тож і запис у кожного свій
+_END = object()
+
+
+class StageRecord: #сумарний час етапу за один запис
+    __slots__ = ('name', 'seconds', 'calls', 'rows', 'peak_bytes')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.seconds = 0.0
+        self.calls = 0
+        self.rows: Optional[int] = None
+        self.peak_bytes: Optional[int] = None  #найбільший приріст пам'яті під час етапу (з track_memory)
+
+
+class Stage: #етап, що саме виконується; rows можна задати всередині with
+    __slots__ = ('name', 'rows', 'start', 'base_bytes', 'peak_bytes')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.rows: Optional[int] = None
+        self.start = 0.0
+        self.base_bytes = 0
+        self.peak_bytes = 0
+
+
+class Recorder: #заміри етапів однієї сесії, за бажанням - з пам'яттю та cProfile
+    def __init__(self, track_memory: bool = False, profile: bool = False):
+        self.track_memory = track_memory
+        self.profile = profile
+        self.records: Dict[str, StageRecord] = {}
+        self._stack: List[Stage] = []
+        self._profiler: Optional[cProfile.Profile] = None
+        self._profile_stats: Optional[bytes] = None
+
+    def enter(self, name: str) -> Stage:
+        stage = Stage(f"{self._stack[-1].name}/{name}" if self._stack else name)
+        if self.track_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack: #reset_peak скидає й пік зовнішнього етапу, тож він зберігається тут
+                self._stack[-1].peak_bytes = max(self._stack[-1].peak_bytes, peak)
+            tracemalloc.reset_peak()
+            stage.base_bytes = stage.peak_bytes = current
+        self._stack.append(stage)
+        stage.start = time.perf_counter()
+        return stage
+
+    def exit(self, stage: Stage) -> None:
+        elapsed = time.perf_counter() - stage.start
+        self._stack.pop()
+        record = self.records.get(stage.name)
+        if record is None:
+            record = self.records[stage.name] = StageRecord(stage.name)
+        record.seconds += elapsed
+        record.calls += 1
+        if stage.rows is not None:
+            record.rows = stage.rows
+        if self.track_memory and tracemalloc.is_tracing():
+            peak = max(stage.peak_bytes, tracemalloc.get_traced_memory()[1])
+            record.peak_bytes = max(record.peak_bytes or 0, peak - stage.base_bytes)
+            if self._stack:
+                self._stack[-1].peak_bytes = max(self._stack[-1].peak_bytes, peak)
+
+    def start(self) -> None:
+        #tracemalloc один на процес: пам'ять варто міряти, коли запис веде лише одна сесія
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.profile:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def stop(self) -> None:
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.create_stats()
+            self._profile_stats = marshal.dumps(self._profiler.stats)  #той самий формат, що й Profile.dump_stats
+            self._profiler = None
+        if self.track_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def profile_bytes(self) -> Optional[bytes]: #файл .prof для pstats/snakeviz з останнього запису
+        return self._profile_stats
+
+    def rows(self) -> List[StageRecord]: #етапи в порядку першого запуску
+        return list(self.records.values())
+
+    def report(self) -> str:
+        lines = [f"{'етап':<40} {'мс':>9} {'викл.':>6} {'рядків':>9} {'пам., МБ':>9}"]
+        for r in self.rows():
+            rows = '' if r.rows is None else str(r.rows)
+            peak = '' if r.peak_bytes is None else f"{r.peak_bytes / 2 ** 20:.1f}"
+            lines.append(f"{r.name:<40} {r.seconds * 1000:9.1f} {r.calls:6d} {rows:>9} {peak:>9}")
+        return "\n".join(lines)
+
+
+def active() -> Optional[Recorder]:
+    return getattr(_local, 'recorder', None)
+
+
+@contextmanager
+def recording(recorder: Optional[Recorder]) -> Iterator[Optional[Recorder]]:
+    #None - нічого не міряється; так зручно вмикати заміри прапорцем
+    if recorder is None:
+        yield None
+        return
+    previous = active()
+    _local.recorder = recorder
+    recorder.start()
+    try:
+        yield recorder
+    finally:
+        recorder.stop()
+        _local.recorder = previous
+
+
+class _NullStage: #заглушка, коли запис вимкнено: rows можна присвоїти, але він нікуди не йде
+    __slots__ = ('rows',)
+
+    def __init__(self):
+        self.rows = None
+
+
+@contextmanager
+def stage(name: str) -> Iterator[Stage]:
+    recorder = active()
+    if recorder is None:
+        yield _NullStage()
+        return
+    current = recorder.enter(name)
+    try:
+        yield current
+    finally:
+        recorder.exit(current)
+
+
+def timed(name: str, rows: Optional[Callable] = None) -> Callable:
+    #декоратор етапу; rows(result, *args) повертає к-сть оброблених рядків
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            recorder = getattr(_local, 'recorder', None)
+            if recorder is None:
+                return func(*args, **kwargs)
+            current = recorder.enter(name)
+            try:
+                result = func(*args, **kwargs)
+                if rows is not None:
+                    current.rows = rows(result, *args)
+                return result
+            finally:
+                recorder.exit(current)
+        return wrapper
+    return decorator
+
+
+def timed_iter(name: str, iterable: Iterable, rows: Optional[Callable] = None) -> Iterator:
+    #час отримання кожного елемента (наприклад, читання частини csv) додається до одного етапу;
+    #rows(item) - к-сть рядків в елементі, в етап записується їх сума
+    recorder = active()
+    if recorder is None:
+        yield from iterable
+        return
+    iterator = iter(iterable)
+    total = 0
+    while True:
+        current = recorder.enter(name)
+        try:
+            item = next(iterator, _END)
+            if rows is not None and item is not _END:
+                total += rows(item)
+                current.rows = total
+        finally:
+            recorder.exit(current)
+        if item is _END:
+            return
+        yield item
+
+
+def profile_text(profile_stats: bytes, limit: int = 30) -> str: #текстовий звіт pstats з байтів .prof
+    import pstats
+    stats = pstats.Stats(_StatsSource(profile_stats), stream=io.StringIO())
+    stats.sort_stats('cumulative').print_stats(limit)
+    return stats.stream.getvalue()
+
+
+class _StatsSource: #pstats.Stats приймає об'єкт з create_stats/stats замість файлу
+    def __init__(self, profile_stats: bytes):
+        self.stats = marshal.loads(profile_stats)
+
+    def create_stats(self) -> None:
+        pass
@@ -0,0 +1,1211 @@
+from __future__ import annotations  #анотації не обчислюються, тож numpy/pandas не потрібні при імпорті
+
+import bisect
+import heapq
+import json
+import math
+import os
+import sys
+from typing import Callable, Iterator, List, Dict, Optional, Tuple
+
+import profiling
+import storage
+from lazy import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+#типи колонок для читання csv (категорії замість рядків для повторюваних значень)
+CLASS_DTYPES = {'parallel': 'int16', 'vertical': 'category'}
+STUDENT_DTYPES = {'birth_year': 'int32', 'gender': 'category', 'average_grade': 'float64',
+                  'class_parallel': 'int16', 'class_vertical': 'category'}
+STUDENT_FIELDS = ['last_name', 'first_name', 'middle_name', 'birth_year', 'gender', 'average_grade']
+TABLE_COLUMNS = ['class_name', 'parallel', 'vertical', 'gender', 'birth_year', 'average_grade']
+GRADUATION_PARALLEL = 11  #паралель, що випускається при переведенні
+STREAM_CHUNKSIZE = 50_000  #рядків students.csv за один крок потокового завантаження
+ROLLUP_DIMS = ('parallel', 'vertical', 'gender', 'birth_year')  #виміри зведення School.rollup
+ROLLUP_SUFFIX = '.rollup.json'  #зведення зберігається поруч з файлом учнів: students.csv -> students.rollup.json
+
+
+#ств класів для 1 сценарію
+class Student: #ств класу Учень, він зберігає дані та середню оцінку
+    __slots__ = ('last_name', 'first_name', 'middle_name', 'birth_year', 'gender', 'average_grade')
+
+    def __init__(self, last_name: str, first_name: str, middle_name: str,
+                 birth_year: int, gender: str, average_grade: float):
+        self.last_name = last_name
+        self.first_name = first_name
+        self.middle_name = middle_name
+        self.birth_year = birth_year
+        self.gender = gender
+        self.average_grade = average_grade
+
+    def get_full_name(self) -> str: #повернення понвого імені учня
+        return f"{self.last_name} {self.first_name} {self.middle_name}"
+
+
+NAME_FIELDS = ['last_name', 'first_name', 'middle_name']
+
+
+class StudentStore: #учні зберігаються колонками: масиви numpy, коди статі та пул рядків для імен
+    def __init__(self):
+        self.size = 0
+        self.names = np.empty((0, 3), dtype=np.int32)  #індекси прізвища, імені, по батькові у пулі
+        self.birth_year = np.empty(0, dtype=np.int16)
+        self.average_grade = np.empty(0, dtype=np.float64)
+        self.gender = np.empty(0, dtype=np.uint8)  #код статі у списку genders
+        self.pool: List[str] = []  #кожен рядок зберігається один раз
+        self.genders: List[str] = []
+        self._pool_index: Dict[str, int] = {}
+        self._gender_index: Dict[str, int] = {}
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "StudentStore":
+        store = cls()
+        store.append_frame(frame)
+        return store
+
+    def append_frame(self, frame: pd.DataFrame) -> None: #додавання таблиці учнів без циклу по рядках
+        n = len(frame)
+        names = pd.concat([frame[name] for name in NAME_FIELDS], ignore_index=True)
+        codes, uniques = pd.factorize(names, use_na_sentinel=False)
+        pool_codes = np.array([self.intern(name) for name in uniques.tolist()], dtype=np.int32)
+        g_codes, g_uniques = pd.factorize(frame['gender'].astype(str))
+        gender_codes = np.array([self.gender_code(g) for g in g_uniques.tolist()], dtype=np.uint8)
+
+        self.names = np.concatenate([self.names[:self.size], pool_codes[codes].reshape(3, n).T])
+        self.birth_year = np.concatenate([self.birth_year[:self.size], frame['birth_year'].to_numpy(dtype=np.int16)])
+        self.average_grade = np.concatenate([self.average_grade[:self.size],
+                                             frame['average_grade'].to_numpy(dtype=np.float64)])
+        self.gender = np.concatenate([self.gender[:self.size], gender_codes[g_codes]])
+        self.size += n
+
+    def __len__(self) -> int:
+        return self.size
+
+    def intern(self, name: str) -> int: #індекс рядка у пулі
+        index = self._pool_index.get(name)
+        if index is None:
+            index = self._pool_index[name] = len(self.pool)
+            self.pool.append(name)
+        return index
+
+    def gender_code(self, gender: str) -> int:
+        code = self._gender_index.get(gender)
+        if code is None:
+            code = self._gender_index[gender] = len(self.genders)
+            self.genders.append(gender)
+        return code
+
+    def append(self, student: Student) -> int: #додавання учня, повертає номер рядка
+        if self.size == len(self.birth_year):
+            self._grow(max(16, 2 * self.size))
+        row = self.size
+        self.names[row] = [self.intern(student.last_name), self.intern(student.first_name),
+                           self.intern(student.middle_name)]
+        self.birth_year[row] = student.birth_year
+        self.average_grade[row] = student.average_grade
+        self.gender[row] = self.gender_code(student.gender)
+        self.size += 1
+        return row
+
+    def view(self, row: int) -> "StudentView":
+        return StudentView(self, row)
+
+    def nbytes(self) -> int: #пам'ять масивів та пулу рядків
+        arrays = self.names.nbytes + self.birth_year.nbytes + self.average_grade.nbytes + self.gender.nbytes
+        return arrays + sum(sys.getsizeof(name) for name in self.pool) + sys.getsizeof(self.pool)
+
+    def _grow(self, capacity: int) -> None:
+        self.names = np.resize(self.names, (capacity, 3))
+        self.birth_year = np.resize(self.birth_year, capacity)
+        self.average_grade = np.resize(self.average_grade, capacity)
+        self.gender = np.resize(self.gender, capacity)
+
+
+class StudentView: #легкий учень-вказівник на рядок StudentStore, має той самий інтерфейс, що й Student
+    __slots__ = ('_store', '_row')
+
+    def __init__(self, store: StudentStore, row: int):
+        self._store = store
+        self._row = row
+
+    def _name(self, field: int) -> str:
+        return self._store.pool[self._store.names[self._row, field]]
+
+    def _set_name(self, field: int, value: str) -> None:
+        self._store.names[self._row, field] = self._store.intern(value)
+
+    last_name = property(lambda self: self._name(0), lambda self, v: self._set_name(0, v))
+    first_name = property(lambda self: self._name(1), lambda self, v: self._set_name(1, v))
+    middle_name = property(lambda self: self._name(2), lambda self, v: self._set_name(2, v))
+
+    @property
+    def birth_year(self) -> int:
+        return int(self._store.birth_year[self._row])
+
+    @birth_year.setter
+    def birth_year(self, value: int) -> None:
+        self._store.birth_year[self._row] = value
+
+    @property
+    def gender(self) -> str:
+        return self._store.genders[self._store.gender[self._row]]
+
+    @gender.setter
+    def gender(self, value: str) -> None:
+        self._store.gender[self._row] = self._store.gender_code(value)
+
+    @property
+    def average_grade(self) -> float:
+        return float(self._store.average_grade[self._row])
+
+    @average_grade.setter
+    def average_grade(self, value: float) -> None:
+        self._store.average_grade[self._row] = value
+
+    def get_full_name(self) -> str:
+        return f"{self.last_name} {self.first_name} {self.middle_name}"
+
+
+def _students_from_frame(frame: Optional[pd.DataFrame], rows: np.ndarray) -> List[Student]:
+    #створення об'єктів Student для вибраних рядків таблиці
+    if frame is None or len(rows) == 0:
+        return []
+    part = frame.iloc[rows]
+    columns = [part[name].tolist() for name in STUDENT_FIELDS]
+    return [Student(*values) for values in zip(*columns)]
+
+
+class ClassStats: #накопичувані показники одного класу (к-сть, стать, сума та сума квадратів оцінок)
+    def __init__(self):
+        self.count = 0
+        self.grade_sum = 0.0
+        self.grade_sumsq = 0.0
+        self.genders: Dict[str, int] = {}
+        #клітинки зведення класу: (стать, рік народження) -> [к-сть, сума балів, сума квадратів балів]
+        self.cells: Dict[Tuple[str, int], list] = {}
+
+    def add(self, gender: str, grade: float, birth_year: int) -> None:
+        self.count += 1
+        self.grade_sum += grade
+        self.grade_sumsq += grade * grade
+        self.genders[gender] = self.genders.get(gender, 0) + 1
+        cell = self.cells.get((gender, int(birth_year)))
+        if cell is None:
+            self.cells[(gender, int(birth_year))] = [1, grade, grade * grade]
+        else:
+            cell[0] += 1
+            cell[1] += grade
+            cell[2] += grade * grade
+
+    def copy(self) -> "ClassStats":
+        copy = ClassStats()
+        copy.merge(self)
+        return copy
+
+    def merge(self, other: "ClassStats") -> None:
+        self.count += other.count
+        self.grade_sum += other.grade_sum
+        self.grade_sumsq += other.grade_sumsq
+        for gender, count in other.genders.items():
+            self.genders[gender] = self.genders.get(gender, 0) + count
+        for key, (count, grade_sum, grade_sumsq) in other.cells.items() if other.cells else ():
+            cell = self.cells.get(key)
+            if cell is None:
+                self.cells[key] = [count, grade_sum, grade_sumsq]
+            else:
+                cell[0] += count
+                cell[1] += grade_sum
+                cell[2] += grade_sumsq
+
+
+class SchoolClass: #ств класу у школі, він зберігає інфо про список учнів
+
+    def __init__(self, parallel: int, vertical: str):
+        self.cohort = parallel  #стабільний номер потоку: паралель при нульовому зсуві року школи
+        self.vertical = vertical
+        self._frame: Optional[pd.DataFrame] = None  #спільна таблиця учнів школи
+        self._rows = np.empty(0, dtype=np.intp)  #номери рядків цього класу у спільній таблиці
+        self._store: Optional[StudentStore] = None  #колонкове сховище учнів (компактний режим школи)
+        self._students: Optional[List[Student]] = []  #None - об'єкти ще не створені з таблиці
+        self._school: Optional["School"] = None  #школа, яку треба повідомляти про зміни
+        self._shared_students = False  #список _students спільний з копією класу в іншій версії школи
+        self.stats = ClassStats()
+
+    @property
+    def parallel(self) -> int: #паралель обчислюється зі зсуву навчального року школи
+        if self._school is None:
+            return self.cohort
+        return self.cohort + self._school.year_offset
+
+    @parallel.setter
+    def parallel(self, value: int) -> None:
+        self.cohort = value - (self._school.year_offset if self._school is not None else 0)
+
+    @property
+    def students(self) -> List[Student]: #об'єкти Student створюються лише при першому зверненні
+        if self._students is None and self._store is not None:
+            self._students = [StudentView(self._store, row) for row in self._rows.tolist()]
+        elif self._students is None:
+            self._students = _students_from_frame(self._frame, self._rows)
+        return self._students
+
+    def attach_rows(self, frame: pd.DataFrame, rows: np.ndarray,
+                    store: Optional[StudentStore] = None) -> None: #прив'язка класу до рядків таблиці
+        self._frame = frame
+        self._rows = rows
+        self._store = store
+        self._students = None
+
+    def fork(self, school: Optional["School"]) -> "SchoolClass":
+        #копія класу для іншої версії школи: учні (таблиця, сховище, список) спільні, показники - свої
+        copy = SchoolClass.__new__(SchoolClass)
+        copy.__dict__.update(self.__dict__)
+        copy._school = school
+        copy.stats = self.stats.copy()
+        if self._students is not None:
+            self._shared_students = copy._shared_students = True
+        return copy
+
+    def add_student(self, student: Student) -> None:  #додавання учня до класу
+        if self._school is not None:
+            self._school._before_write()
+        if self._shared_students: #список копіюється лише тоді, коли в нього справді дописують
+            self._students = list(self.students)
+            self._shared_students = False
+        self.students.append(student)
+        self.stats.add(student.gender, student.average_grade, student.birth_year)
+        if self._school is not None:
+            self._school._on_student_added(self, student)
+
+    def get_name(self) -> str:
+        return f"{self.parallel}-{self.vertical}" #повертатиме назву класу
+
+    def get_student_count(self) -> int: #повертатиме к-сть учнів у класі
+        if self._students is None: #клас з таблиці: к-сть є у статистиці, навіть якщо рядки не збережені
+            return self.stats.count
+        return len(self._students)
+
+    def promote_class(self) -> None: #переведення одного класу; вся школа переводиться через promote_all_classes
+        if self._school is None:
+            self.cohort += 1
+        else:
+            self._school._move_class(self, self.cohort + 1)
+
+
+class SchoolStats: #показники школи, що оновлюються при кожній зміні замість перерахунку
+    def __init__(self):
+        self.total = 0
+        self.grade_sum = 0.0
+        self.grade_sumsq = 0.0
+        self.genders: Dict[str, int] = {}
+        #порядок додавання класу (при рівності к-сті береться перший клас) -> клас, лише наявні класи
+        self._classes: Dict[int, SchoolClass] = {}
+        self._order: Dict[SchoolClass, int] = {}
+        self._max_heap: List[tuple] = []  #(-к-сть, порядок), застарілі записи відкидаються при читанні
+        self._min_heap: List[tuple] = []  #(к-сть, порядок)
+        self._next_order = 0
+
+    def fork(self, classes: Dict[SchoolClass, SchoolClass]) -> "SchoolStats":
+        #ті самі показники над копіями класів (classes: клас -> його копія)
+        copy = SchoolStats()
+        copy.total = self.total
+        copy.grade_sum = self.grade_sum
+        copy.grade_sumsq = self.grade_sumsq
+        copy.genders = dict(self.genders)
+        copy._classes = {order: classes[cls] for order, cls in self._classes.items()}
+        copy._order = {classes[cls]: order for cls, order in self._order.items()}
+        copy._max_heap = list(self._max_heap)
+        copy._min_heap = list(self._min_heap)
+        copy._next_order = self._next_order
+        return copy
+
+    def add_class(self, school_class: SchoolClass, order: Optional[int] = None) -> None:
+        if order is None: #order передається при поверненні класу, щоб зберегти його місце
+            order = self._next_order
+            self._next_order += 1
+        self._order[school_class] = order
+        self._classes[order] = school_class
+        self._merge(school_class.stats, 1)
+        self._push(school_class)
+
+    def remove_class(self, school_class: SchoolClass) -> Optional[int]:
+        order = self._order.pop(school_class, None)
+        if order is not None:
+            del self._classes[order]
+            self._merge(school_class.stats, -1)
+        return order
+
+    def add_to_class(self, school_class: SchoolClass, delta: ClassStats) -> None: #дописування частини учнів
+        school_class.stats.merge(delta)
+        if school_class in self._order:
+            self._merge(delta, 1)
+            self._push(school_class)
+
+    def add_student(self, school_class: SchoolClass, gender: str, grade: float) -> None:
+        #статистика самого класу вже оновлена, тут лише підсумки школи - O(log n)
+        self.total += 1
+        self.grade_sum += grade
+        self.grade_sumsq += grade * grade
+        self.genders[gender] = self.genders.get(gender, 0) + 1
+        if school_class in self._order:
+            self._push(school_class)
+
+    def largest_class(self) -> Optional[SchoolClass]:
+        return self._top(self._max_heap, -1)
+
+    def smallest_class(self) -> Optional[SchoolClass]:
+        return self._top(self._min_heap, 1)
+
+    def mean_grade(self) -> float:
+        return self.grade_sum / self.total if self.total else 0.0
+
+    def grade_std(self) -> float:
+        if not self.total:
+            return 0.0
+        mean = self.mean_grade()
+        return math.sqrt(max(self.grade_sumsq / self.total - mean * mean, 0.0))
+
+    def _merge(self, stats: ClassStats, sign: int) -> None:
+        self.total += sign * stats.count
+        self.grade_sum += sign * stats.grade_sum
+        self.grade_sumsq += sign * stats.grade_sumsq
+        for gender, count in stats.genders.items():
+            self.genders[gender] = self.genders.get(gender, 0) + sign * count
+
+    def _push(self, school_class: SchoolClass) -> None:
+        count, order = school_class.stats.count, self._order[school_class]
+        heapq.heappush(self._max_heap, (-count, order))
+        heapq.heappush(self._min_heap, (count, order))
+        if len(self._max_heap) > 4 * len(self._classes) + 64:  #прибирання застарілих записів
+            self._rebuild_heaps()
+
+    def _rebuild_heaps(self) -> None:
+        self._max_heap = [(-c.stats.count, order) for order, c in self._classes.items()]
+        self._min_heap = [(c.stats.count, order) for order, c in self._classes.items()]
+        heapq.heapify(self._max_heap)
+        heapq.heapify(self._min_heap)
+
+    def _top(self, heap: List[tuple], sign: int) -> Optional[SchoolClass]:
+        while heap:
+            count, order = heap[0]
+            school_class = self._classes.get(order)
+            if school_class is not None and school_class.stats.count == sign * count:
+                return school_class
+            heapq.heappop(heap)
+        return None
+
+
+def _to_number(column: pd.Series) -> pd.Series:
+    #astype у рази швидший за to_numeric, тож він пробується першим; якщо хоч одне значення не число,
+    #колонка перетворюється повільніше з NaN на місці некоректних значень
+    try:
+        return column.astype('float64')
+    except (TypeError, ValueError):
+        return pd.to_numeric(column, errors='coerce')
+
+
+def _validate_students_chunk(raw: pd.DataFrame, line_offset: int) -> Tuple[pd.DataFrame, List[Tuple[int, str]]]:
+    #перевірка частини students.csv, прочитаної як рядки; повертає коректні рядки та список помилок
+    birth = _to_number(raw['birth_year'])
+    grade = _to_number(raw['average_grade'])
+    parallel = _to_number(raw['class_parallel'])
+    checks = [
+        (raw[NAME_FIELDS].isna().any(axis=1), "порожнє прізвище, ім'я чи по батькові"),
+        (birth.isna() | (birth != birth.round()), "некоректний рік народження"),
+        (raw['gender'].isna(), "не вказана стать"),
+        (grade.isna(), "некоректна середня оцінка"),
+        (parallel.isna() | (parallel != parallel.round()), "некоректна паралель"),
+        (raw['class_vertical'].isna(), "не вказана вертикаль"),
+    ]
+    bad = np.zeros(len(raw), dtype=bool)
+    reasons = np.full(len(raw), "", dtype=object)
+    for mask, reason in checks:
+        mask = mask.to_numpy() & ~bad  #для кожного рядка записується перша знайдена причина
+        reasons[mask] = reason
+        bad |= mask
+
+    errors = [(int(i) + line_offset, reason) for i, reason in zip(raw.index[bad], reasons[bad])]
+    good = ~bad
+    frame = raw.loc[good, NAME_FIELDS + ['gender', 'class_vertical']].copy()
+    frame['birth_year'] = birth[good].astype('int32')
+    frame['average_grade'] = grade[good].astype('float64')
+    frame['class_parallel'] = parallel[good].astype('int16')
+    return frame, errors
+
+
+def _reduce_cells(keys: np.ndarray, counts: np.ndarray, sums: np.ndarray, sumsq: np.ndarray) -> tuple:
+    #сумування значень з однаковим ключем клітинки; повертає унікальні ключі та їхні суми
+    unique, inverse = np.unique(keys, return_inverse=True)
+    return (unique, np.bincount(inverse, weights=counts, minlength=len(unique)).astype(np.int64),
+            np.bincount(inverse, weights=sums, minlength=len(unique)),
+            np.bincount(inverse, weights=sumsq, minlength=len(unique)))
+
+
+class _StudentIngest: #поступове додавання учнів до класів школи частинами таблиці
+    def __init__(self, school: "School", keep_students: bool = True):
+        school._before_write()
+        self.school = school
+        self.keep_students = keep_students  #False - лише показники, рядки учнів не зберігаються
+        self.classes = list(school.classes.values())
+        self.index = pd.MultiIndex.from_tuples([(c.parallel, c.vertical) for c in self.classes])
+        self.parts: List[pd.DataFrame] = []
+        self.codes: List[np.ndarray] = []
+        self.rows: List[List[np.ndarray]] = [[] for _ in self.classes]
+        self.size = 0
+        self.store = StudentStore() if school.compact else None
+        #клітинки зведення накопичуються масивами й розкладаються по класах один раз у finish
+        self.genders: Dict[str, int] = {}  #стать -> її код у ключі клітинки та колонка в gender_counts
+        self.cell_parts: List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = []
+        #показники класів теж накопичуються масивами: підсумки школи оновлюються після кожної частини,
+        #а показники самих класів і купи найбільшого/найменшого класу - один раз у finish
+        self.counts = np.zeros(len(self.classes), dtype=np.int64)
+        self.sums = np.zeros(len(self.classes))
+        self.sumsq = np.zeros(len(self.classes))
+        self.gender_counts = np.zeros((len(self.classes), 0), dtype=np.int64)
+        for cls in self.classes:
+            order = school.stats.remove_class(cls)
+            cls.stats = ClassStats()
+            cls.attach_rows(None, np.empty(0, dtype=np.intp))
+            school.stats.add_class(cls, order)
+
+    def add(self, students_df: pd.DataFrame) -> int: #повертає к-сть учнів, що потрапили в класи
+        #групування учнів по класах без циклу по рядках
+        student_keys = pd.MultiIndex.from_arrays([students_df['class_parallel'].astype('int64'),
+                                                  students_df['class_vertical'].astype(str)])
+        codes = self.index.get_indexer(student_keys)
+        known = codes >= 0  #учні з невідомих класів відкидаються, як і раніше
+        frame = students_df[known].reset_index(drop=True)
+        codes = codes[known]
+        n_classes = len(self.classes)
+
+        #показники по класах одним проходом: суми оцінок і таблиця клас x стать
+        grades = frame['average_grade'].to_numpy(dtype='float64')
+        g_codes, g_names = pd.factorize(frame['gender'])
+        g_names = [str(g) for g in g_names]
+        valid = g_codes >= 0
+        g_global = np.array([self.genders.setdefault(g, len(self.genders)) for g in g_names], dtype=np.int64)
+        n_genders = len(self.genders)
+        if self.gender_counts.shape[1] < n_genders:
+            self.gender_counts = np.pad(self.gender_counts, ((0, 0), (0, n_genders - self.gender_counts.shape[1])))
+        self.counts += np.bincount(codes, minlength=n_classes)
+        self.sums += np.bincount(codes, weights=grades, minlength=n_classes)
+        self.sumsq += np.bincount(codes, weights=grades * grades, minlength=n_classes)
+        self.gender_counts += np.bincount(codes[valid] * n_genders + g_global[g_codes[valid]],
+                                          minlength=n_classes * n_genders).reshape(n_classes, n_genders)
+
+        delta = ClassStats()  #уся частина як одна зміна підсумків школи
+        delta.count = len(codes)
+        delta.grade_sum = float(grades.sum())
+        delta.grade_sumsq = float((grades * grades).sum())
+        delta.genders = {g: int(n) for g, n in zip(g_names, np.bincount(g_codes[valid], minlength=len(g_names)))
+                         if n}
+        self.school.stats._merge(delta, 1)
+
+        #клітинки зведення клас x стать x рік народження: ключ (клас << 24) | (стать << 16) | рік
+        keys = ((codes[valid].astype(np.int64) << 24) | (g_global[g_codes[valid]] << 16)
+                | (frame['birth_year'].to_numpy(dtype=np.int64)[valid] & 0xFFFF))
+        self.cell_parts.append(_reduce_cells(keys, np.ones(len(keys), dtype=np.int64), grades[valid],
+                                             grades[valid] * grades[valid]))
+        #частини зливаються, коли нових рядків стає більше, ніж у вже злитій: пам'ять не росте з к-стю частин,
+        #а кожна клітинка пересортовується O(log) разів
+        if sum(len(part[0]) for part in self.cell_parts[1:]) > max(len(self.cell_parts[0][0]), 1 << 16):
+            self.cell_parts = [_reduce_cells(*map(np.concatenate, zip(*self.cell_parts)))]
+
+        if self.keep_students:
+            order = np.argsort(codes, kind='stable') + self.size
+            counts = np.bincount(codes, minlength=n_classes)
+            for rows, part in zip(self.rows, np.split(order, np.cumsum(counts)[:-1])):
+                if len(part):
+                    rows.append(part)
+            if self.store is not None: #імена переносяться у пул рядків і більше не тримаються в таблиці
+                self.store.append_frame(frame)
+                frame = frame.drop(columns=NAME_FIELDS)
+            self.parts.append(frame)
+            self.codes.append(codes)
+            self.size += len(frame)
+        return len(codes)
+
+    def finish(self) -> None:
+        school = self.school
+        genders = list(self.genders)
+        for cls, count, total, total_sq, by_gender in zip(self.classes, self.counts.tolist(), self.sums.tolist(),
+                                                          self.sumsq.tolist(), self.gender_counts.tolist()):
+            if count:
+                stats = cls.stats
+                stats.count, stats.grade_sum, stats.grade_sumsq = count, total, total_sq
+                stats.genders = {g: n for g, n in zip(genders, by_gender) if n}
+        school.stats._rebuild_heaps()
+        if self.cell_parts:
+            keys, counts, sums, sumsq = _reduce_cells(*map(np.concatenate, zip(*self.cell_parts)))
+            cell_genders = np.array(genders, dtype=object)[(keys >> 16) & 0xFF].tolist()
+            cells = [cls.stats.cells for cls in self.classes]
+            for code, gender, year, count, total, total_sq in zip((keys >> 24).tolist(), cell_genders,
+                                                                  (keys & 0xFFFF).tolist(), counts.tolist(),
+                                                                  sums.tolist(), sumsq.tolist()):
+                cells[code][(gender, year)] = [count, total, total_sq]
+            self.cell_parts = []
+        frame = None
+        if self.keep_students and self.parts:
+            frame = pd.concat(self.parts, ignore_index=True) if len(self.parts) > 1 else self.parts[0]
+            frame['gender'] = frame['gender'].astype('category')
+            frame['class_vertical'] = frame['class_vertical'].astype('category')
+            frame['class_key'] = pd.Categorical.from_codes(np.concatenate(self.codes),
+                                                           categories=[c.get_name() for c in self.classes])
+            for cls, rows in zip(self.classes, self.rows):
+                cls.attach_rows(frame, np.concatenate(rows) if rows else np.empty(0, dtype=np.intp), self.store)
+        school._frame = frame
+        school._frame_classes = self.classes
+        school._student_index = None
+        school._invalidate_students_table()
+
+
+class _SortedColumn: #відсортовані ключі з номерами учнів для пошуку діапазону бісекцією
+    MERGE_SIZE = 4096  #нові ключі накопичуються в малому списку і вливаються в масив пачкою
+
+    def __init__(self, keys: np.ndarray, ids: np.ndarray):
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.ids = ids[order]
+        self._delta: List[tuple] = []  #(ключ, номер), відсортований
+
+    def __len__(self) -> int:
+        return len(self.keys) + len(self._delta)
+
+    def add(self, key, student_id: int) -> None:
+        bisect.insort(self._delta, (key, student_id))
+        if len(self._delta) >= self.MERGE_SIZE:
+            keys = np.array([k for k, _ in self._delta], dtype=self.keys.dtype)
+            at = np.searchsorted(self.keys, keys, side='right')
+            self.keys = np.insert(self.keys, at, keys)
+            self.ids = np.insert(self.ids, at, [i for _, i in self._delta])
+            self._delta = []
+
+    def range(self, low, high) -> np.ndarray: #номери з low <= ключ <= high у порядку ключів
+        lo = np.searchsorted(self.keys, low, side='left')
+        hi = np.searchsorted(self.keys, high, side='right')
+        found = self.ids[lo:hi]
+        if not self._delta:
+            return found
+        extra = []
+        for key, student_id in self._delta[bisect.bisect_left(self._delta, (low,)):]:
+            if key > high:
+                break
+            extra.append((key, student_id))
+        if not extra:
+            return found
+        #злиття двох відсортованих частин, щоб результат лишився в порядку ключів
+        keys = np.concatenate([self.keys[lo:hi], np.array([k for k, _ in extra], dtype=self.keys.dtype)])
+        ids = np.concatenate([found, np.array([i for _, i in extra], dtype=found.dtype)])
+        return ids[np.argsort(keys, kind='stable')]
+
+
+def _name_key(full_name: str) -> str: #пошук за ПІБ не залежить від регістру
+    return full_name.casefold()
+
+
+class StudentIndex: #вторинні індекси учнів школи: ПІБ, рік народження зі статтю, середній бал
+    #учень позначається номером: рядки спільної таблиці мають номери рядків, додані пізніше - наступні
+    def __init__(self, school: "School"):
+        frame = self.frame = school._frame
+        self.classes: List[SchoolClass] = list(school._frame_classes)
+        self._class_codes: Dict[SchoolClass, int] = {cls: i for i, cls in enumerate(self.classes)}
+        self.n_frame = 0 if frame is None else len(frame)
+        self.store = next((cls._store for cls in self.classes if cls._store is not None), None)  #компактний режим
+        self.extra: List[Tuple[SchoolClass, Student]] = []  #учні, додані не з таблиці
+        self._extra_codes: List[int] = []
+        self.class_code = np.empty(0, dtype=np.int32)
+        self.frame_pos = np.empty(0, dtype=np.intp)  #позиція рядка таблиці у списку students його класу
+        names = np.empty(0, dtype=object)
+        grades = np.empty(0, dtype=np.float64)
+        self.by_birth_keys: Dict[Tuple[int, str], np.ndarray] = {}
+        if self.n_frame:
+            self.class_code = frame['class_key'].cat.codes.to_numpy().astype(np.int32)
+            self.frame_pos = np.full(self.n_frame, -1, dtype=np.intp)
+            for cls in self.classes:
+                if cls._frame is frame:
+                    self.frame_pos[cls._rows] = np.arange(len(cls._rows))
+            names = self._frame_names(frame)
+            grades = frame['average_grade'].to_numpy(dtype=np.float64)
+            groups = frame.groupby([frame['birth_year'].astype('int64'), frame['gender'].astype(str)],
+                                   observed=True, sort=False).indices
+            self.by_birth_keys = {(int(year), gender): rows for (year, gender), rows in groups.items()}
+        ids = np.arange(self.n_frame, dtype=np.int64)
+        self.names = _SortedColumn(names, ids)
+        self.grades = _SortedColumn(grades, ids)
+        self._birth_added: Dict[Tuple[int, str], List[int]] = {}
+
+        for cls in school.classes.values(): #учні, додані через add_student
+            if cls._students is None:
+                continue
+            start = len(cls._rows) if cls._frame is frame and frame is not None else 0
+            for student in cls._students[start:]:
+                self.add(cls, student)
+
+    def _frame_names(self, frame: pd.DataFrame) -> np.ndarray:
+        store = self.store
+        if store is not None: #компактний режим: імена лише в пулі рядків StudentStore
+            pool = pd.Series(store.pool, dtype=object)
+            parts = [pool.iloc[store.names[:self.n_frame, field]].reset_index(drop=True) for field in range(3)]
+        else:
+            parts = [frame[name].astype(str).reset_index(drop=True) for name in NAME_FIELDS]
+        full = parts[0] + ' ' + parts[1] + ' ' + parts[2]
+        return full.str.casefold().to_numpy(dtype=object)
+
+    def __len__(self) -> int:
+        return self.n_frame + len(self.extra)
+
+    def add(self, school_class: SchoolClass, student: Student) -> None:
+        student_id = len(self)
+        code = self._class_codes.get(school_class)
+        if code is None:
+            code = self._class_codes[school_class] = len(self.classes)
+            self.classes.append(school_class)
+        self.extra.append((school_class, student))
+        self._extra_codes.append(code)
+        self.names.add(_name_key(student.get_full_name()), student_id)
+        self.grades.add(float(student.average_grade), student_id)
+        self._birth_added.setdefault((int(student.birth_year), str(student.gender)), []).append(student_id)
+
+    def by_name_prefix(self, prefix: str) -> np.ndarray:
+        key = _name_key(prefix)
+        return self.names.range(key, key + '\U0010ffff')
+
+    def by_grade(self, low: float, high: float) -> np.ndarray:
+        return self.grades.range(float(low), float(high))
+
+    def by_birth(self, year: Optional[int] = None, gender: Optional[str] = None) -> np.ndarray:
+        #хеш-індекс за (рік, стать); None - будь-яке значення
+        keys = [k for k in set(self.by_birth_keys) | set(self._birth_added)
+                if (year is None or k[0] == year) and (gender is None or k[1] == gender)]
+        parts = [self.by_birth_keys.get(k, np.empty(0, dtype=np.int64)) for k in keys]
+        parts += [np.array(self._birth_added.get(k, []), dtype=np.int64) for k in keys]
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(parts))
+
+    def alive(self, ids: np.ndarray, school: "School") -> np.ndarray:
+        #учні випущених класів лишаються в індексі (для відкату переведення), але не знаходяться
+        alive = np.array([school.classes.get((cls.cohort, cls.vertical)) is cls for cls in self.classes], dtype=bool)
+        codes = np.empty(len(ids), dtype=np.int64)
+        from_frame = ids < self.n_frame
+        codes[from_frame] = self.class_code[ids[from_frame]]
+        if not from_frame.all():
+            codes[~from_frame] = np.asarray(self._extra_codes, dtype=np.int64)[ids[~from_frame] - self.n_frame]
+        return ids[alive[codes]]
+
+    def resolve(self, ids: np.ndarray) -> List[Tuple[SchoolClass, Student]]:
+        #якщо об'єкти класу вже створені, повертаються саме вони; інакше клас не розгортається цілком,
+        #а учень береться з рядка таблиці (StudentView у компактному режимі, копія Student - у звичайному)
+        ids = np.asarray(ids, dtype=np.int64)
+        frame_ids = ids[ids < self.n_frame]
+        detached = {}
+        if len(frame_ids):
+            lazy = np.array([c._students is None for c in self.classes], dtype=bool)[self.class_code[frame_ids]]
+            rows = frame_ids[lazy]
+            if self.store is not None:
+                detached = {row: StudentView(self.store, row) for row in rows.tolist()}
+            elif len(rows):
+                detached = dict(zip(rows.tolist(), _students_from_frame(self.frame, rows)))
+        result = []
+        for student_id in ids.tolist():
+            if student_id < self.n_frame:
+                cls = self.classes[self.class_code[student_id]]
+                student = detached.get(student_id)
+                result.append((cls, student if student is not None else cls.students[self.frame_pos[student_id]]))
+            else:
+                result.append(self.extra[student_id - self.n_frame])
+        return result
+
+
+class School: #ств класу
+    def __init__(self, name: str, compact: bool = False):
+        self.name = name
+        self.compact = compact  #учні зберігаються у StudentStore, а класи повертають StudentView
+        self.classes: Dict[Tuple[int, str], SchoolClass] = {}  #ключ - (потік, вертикаль), не змінюється з роками
+        self.year_offset = 0  #скільки разів школу переведено на наступний рік
+        self._cohorts: Dict[int, List[SchoolClass]] = {}  #потік -> його класи, для швидкого випуску
+        self._graduated: List[List[Tuple[SchoolClass, Optional[int]]]] = []  #випущені класи для відкату
+        self._frame: Optional[pd.DataFrame] = None  #спільна таблиця учнів з файлу
+        self._frame_classes: List[SchoolClass] = []  #клас для кожного коду class_key у таблиці
+        self._students_table: Optional[pd.DataFrame] = None  #кеш для get_all_students_data
+        self._pending_rows: List[dict] = []  #учні, додані після побудови кешу
+        self._table_classes: List[SchoolClass] = []  #клас для кожної категорії class_name у кеші
+        self._table_offset = 0  #зсув року, для якого побудовано кеш
+        self.source: tuple = ()  #відбиток файлів, з яких завантажено дані
+        self.version = 0  #зростає при кожній зміні даних
+        self.stats = SchoolStats()
+        self._student_index: Optional[StudentIndex] = None  #будується при першому пошуку
+        self.load_errors: List[Tuple[int, str]] = []  #(номер рядка students.csv, причина) пропущених рядків
+        self.frozen = False  #знімок (чи заморожена версія) лише для читання
+        self._snapshots: List["School"] = []  #знімки, що ще ділять класи з цією школою
+
+    def __getattr__(self, name: str):
+        #викликається лише для відсутніх атрибутів: так знімок отримує свій стан при першому зверненні
+        base = self.__dict__.get('_snapshot_of')
+        if base is None:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        self._materialize()
+        return getattr(self, name)
+
+    # ---------- версії ----------
+
+    def snapshot(self) -> "School":
+        #знімок поточного стану лише для читання за O(1): класи копіюються (без учнів) перед першою
+        #зміною цієї школи або при першому читанні знімка, учні спільні для всіх версій
+        if self.frozen:
+            return self
+        snap = type(self).__new__(type(self))
+        snap.__dict__['_snapshot_of'] = self
+        self._snapshots.append(snap)
+        return snap
+
+    def fork(self) -> "School":
+        #окрема версія, яку можна змінювати (наприклад, перевести на наступний рік); учні спільні,
+        #список учнів класу копіюється лише при додаванні до нього
+        copy = type(self).__new__(type(self))
+        copy.__dict__.update(self._fork_state(copy, frozen=False))
+        return copy
+
+    def freeze(self) -> None: #школа більше не змінюється, її можна ділити між сесіями та версіями
+        self.frozen = True
+
+    def _before_write(self) -> None:
+        if self.frozen:
+            raise ValueError(f"Знімок школи {self.name} не можна змінювати, потрібна копія через fork()")
+        if self._snapshots: #знімки забирають собі поточний стан, поки школа ще не змінилася
+            pending, self._snapshots = self._snapshots, []
+            for snap in pending:
+                snap._materialize()
+
+    def _materialize(self) -> None:
+        base = self.__dict__.pop('_snapshot_of')
+        if self in base._snapshots:
+            base._snapshots.remove(self)
+        self.__dict__.update(base._fork_state(self, frozen=True))
+
+    def _fork_state(self, target: "School", frozen: bool) -> dict:
+        #стан школи з копіями класів для target: O(к-сті класів), таблиця учнів і сховище не копіюються
+        copies: Dict[SchoolClass, SchoolClass] = {}
+
+        def copy_of(cls: SchoolClass) -> SchoolClass:
+            if cls not in copies:
+                copies[cls] = cls.fork(target)
+            return copies[cls]
+
+        state = dict(self.__dict__)
+        state['classes'] = {key: copy_of(cls) for key, cls in self.classes.items()}
+        state['_cohorts'] = {cohort: [copy_of(cls) for cls in members] for cohort, members in self._cohorts.items()}
+        state['_graduated'] = [[(copy_of(cls), order) for cls, order in year] for year in self._graduated]
+        state['_frame_classes'] = [copy_of(cls) for cls in self._frame_classes]
+        state['_table_classes'] = [copy_of(cls) for cls in self._table_classes]
+        state['stats'] = self.stats.fork(copies)
+        state['_pending_rows'] = list(self._pending_rows)
+        state['_student_index'] = None  #індекс посилається на класи, для версії він будується заново
+        state['frozen'] = frozen
+        state['_snapshots'] = []
+        return state
+
+    def cache_key(self, *parts) -> tuple: #ключ для кешування графіків та агрегатів
+        return (self.name, self.source, self.version) + parts
+
+    def class_key(self, parallel: int, vertical: str) -> Tuple[int, str]: #ключ класу в поточному році
+        return parallel - self.year_offset, vertical
+
+    def get_class(self, parallel: int, vertical: str) -> Optional[SchoolClass]:
+        return self.classes.get(self.class_key(parallel, vertical))
+
+    def add_class(self, school_class: SchoolClass) -> None: #реєстрація класу в школі
+        self._before_write()
+        parallel = school_class.parallel
+        school_class._school = self
+        school_class.parallel = parallel  #паралель зберігається, змінюється лише номер потоку
+        self._insert_class(school_class)
+        self._invalidate_students_table()
+
+    def _insert_class(self, school_class: SchoolClass, order: Optional[int] = None) -> None:
+        key = (school_class.cohort, school_class.vertical)
+        if key in self.classes:
+            self._remove_class(self.classes[key])
+        self.classes[key] = school_class
+        self._cohorts.setdefault(school_class.cohort, []).append(school_class)
+        self.stats.add_class(school_class, order)
+
+    def _remove_class(self, school_class: SchoolClass) -> Optional[int]:
+        del self.classes[(school_class.cohort, school_class.vertical)]
+        cohort = self._cohorts[school_class.cohort]
+        cohort.remove(school_class)
+        if not cohort:
+            del self._cohorts[school_class.cohort]
+        return self.stats.remove_class(school_class)
+
+    def _move_class(self, school_class: SchoolClass, cohort: int) -> None: #переведення окремого класу
+        if (cohort, school_class.vertical) in self.classes:
+            raise ValueError(f"Клас {school_class.parallel + 1}-{school_class.vertical} вже існує")
+        self._before_write()
+        order = self._remove_class(school_class)
+        school_class.cohort = cohort
+        self._insert_class(school_class, order)
+        self._invalidate_students_table()
+
+    @profiling.timed('load_data', rows=lambda result, school, *args, **kwargs: school.stats.total)
+    def load_data(self, classes_file: str, students_file: str, chunksize: Optional[int] = None,
+                  keep_students: bool = True, on_chunk: Optional[Callable[[int], None]] = None,
+                  rollup_cache: bool = False) -> None:
+        #некоректні рядки учнів пропускаються і записуються в load_errors; з chunksize учні читаються
+        #потоково, без нього - одним читанням, що швидше, коли таблиця все одно вся тримається в пам'яті;
+        #формат файлів (csv, feather, parquet) визначається за розширенням.
+        #З rollup_cache зведення зберігається поруч з students_file, а коли самі учні не потрібні
+        #(keep_students=False), свіже зведення читається замість students_file
+        self.load_classes(classes_file)
+        if rollup_cache and not keep_students and self._load_rollup(classes_file, students_file):
+            return
+        if chunksize is not None:
+            self.stream_students(students_file, chunksize, keep_students, on_chunk)
+        else:
+            with profiling.stage('parse') as parse:
+                raw, bad_lines = self._student_table(students_file)
+                parse.rows = len(raw)
+            with profiling.stage('validate'):
+                good, errors = _validate_students_chunk(raw, line_offset=0)
+                self.load_errors = sorted(bad_lines + errors)
+            self._attach_students(good)
+        if rollup_cache:
+            try:
+                self._save_rollup(classes_file, students_file)
+            except OSError:  #каталог даних лише для читання - зведення просто не зберігається
+                pass
+
+    @profiling.timed('load_classes', rows=lambda result, school, *args: len(school.classes))
+    def load_classes(self, classes_file: str) -> None:
+        classes_df = storage.read_table(classes_file, dtype=CLASS_DTYPES)
+        for p, v in zip(classes_df['parallel'].tolist(), classes_df['vertical'].tolist()):
+            self.add_class(SchoolClass(parallel=p, vertical=v))
+
+    def stream_students(self, students_file: str, chunksize: int = STREAM_CHUNKSIZE, keep_students: bool = True,
+                        on_chunk: Optional[Callable[[int], None]] = None) -> int:
+        #читання students.csv частинами: класи та показники оновлюються після кожної частини,
+        #у пам'яті одночасно лише одна необроблена частина; повертає к-сть прочитаних рядків
+        ingest = _StudentIngest(self, keep_students)
+        self.load_errors = []
+        done = ingested = 0
+        for raw, bad_lines in profiling.timed_iter('parse', self._student_chunks(students_file, chunksize),
+                                                   rows=lambda item: len(item[0])):
+            self.load_errors.extend(bad_lines)
+            with profiling.stage('validate'):
+                good, errors = _validate_students_chunk(raw, line_offset=0)
+                self.load_errors.extend(errors)
+            with profiling.stage('ingest') as stage:
+                ingested += ingest.add(good)
+                stage.rows = ingested
+            done += len(raw) + len(bad_lines)
+            if on_chunk is not None:
+                on_chunk(done)
+        with profiling.stage('ingest'):
+            ingest.finish()
+        self.load_errors.sort()
+        return done
+
+    @staticmethod
+    def _student_table(students_file: str) -> Tuple[pd.DataFrame, List[Tuple[int, str]]]:
+        #уся таблиця учнів одним читанням, з тими самими номерами рядків і помилками, що й у _student_chunks
+        if storage.file_format(students_file) == 'csv':
+            return storage.read_csv_checked(students_file)
+        raw = storage.read_table(students_file)
+        raw.index = pd.RangeIndex(2, 2 + len(raw))
+        return raw, []
+
+    @staticmethod
+    def _student_chunks(students_file: str, chunksize: int) -> Iterator[Tuple[pd.DataFrame, List[Tuple[int, str]]]]:
+        #частини учнів як рядки з індексом = номер рядка у файлі та рядки, відкинуті ще до перевірки
+        if storage.file_format(students_file) == 'csv':
+            yield from storage.iter_csv_checked(students_file, chunksize)
+            return
+        line = 2  #у колонкових форматах "рядок" - номер запису, рахуючи заголовок, як у csv
+        for raw in storage.iter_chunks(students_file, chunksize):
+            raw.index = pd.RangeIndex(line, line + len(raw))
+            line += len(raw)
+            yield raw, []
+
+    def _attach_students(self, students_df: pd.DataFrame) -> None: #уся таблиця учнів як одна частина
+        with profiling.stage('ingest') as stage:
+            ingest = _StudentIngest(self)
+            stage.rows = ingest.add(students_df)
+            ingest.finish()
+
+    def _invalidate_students_table(self) -> None:
+        self._students_table = None
+        self._pending_rows = []
+        self.version += 1
+
+    def _on_student_added(self, school_class: SchoolClass, student: Student) -> None:
+        self.version += 1
+        self.stats.add_student(school_class, student.gender, student.average_grade)
+        if self._student_index is not None:
+            self._student_index.add(school_class, student)
+        if self._students_table is not None and self._table_offset != self.year_offset:
+            self._invalidate_students_table()
+        elif self._students_table is not None: #кеш дописується при наступному зверненні
+            self._pending_rows.append({
+                'class_name': school_class.get_name(),
+                'parallel': school_class.parallel,
+                'vertical': school_class.vertical,
+                'gender': student.gender,
+                'birth_year': student.birth_year,
+                'average_grade': student.average_grade
+            })
+
+    def _build_students_table(self) -> pd.DataFrame:
+        #рядки з файлу беруться з таблиці цілими колонками, об'єкти Student - лише додані пізніше
+        ordered = self.ordered_classes()
+        self._table_classes = ordered
+        self._table_offset = self.year_offset
+        position = {cls: i for i, cls in enumerate(ordered)}
+        class_dtype = pd.CategoricalDtype([cls.get_name() for cls in ordered], ordered=True)
+        parts = []
+        if self._frame is not None and len(self._frame):
+            #позиція класу у впорядкованому списку для кожного коду class_key, -1 - класу вже немає
+            frame_pos = np.array([position.get(cls, -1) for cls in self._frame_classes], dtype=np.intp)
+            codes = frame_pos[self._frame['class_key'].cat.codes.to_numpy()]
+            mask = codes >= 0
+            codes = codes[mask]
+            part = self._frame.loc[mask, ['gender', 'birth_year', 'average_grade']].reset_index(drop=True)
+            part.insert(0, 'class_name', pd.Categorical.from_codes(codes, dtype=class_dtype))
+            part.insert(1, 'parallel', np.array([cls.parallel for cls in ordered], dtype='int64')[codes])
+            part.insert(2, 'vertical', np.array([cls.vertical for cls in ordered], dtype=object)[codes])
+            parts.append(part)
+
+        extra = []
+        for cls in self.classes.values():
+            if cls._students is None:
+                continue
+            start = len(cls._rows) if cls._frame is self._frame else 0
+            for s in cls._students[start:]:
+                extra.append({
+                    'class_name': cls.get_name(),
+                    'parallel': cls.parallel,
+                    'vertical': cls.vertical,
+                    'gender': s.gender,
+                    'birth_year': s.birth_year,
+                    'average_grade': s.average_grade
+                })
+        if extra or not parts:
+            added = pd.DataFrame(extra, columns=TABLE_COLUMNS)
+            added['class_name'] = pd.Categorical(added['class_name'], dtype=class_dtype)
+            parts.append(added)
+        if len(parts) == 1:
+            return parts[0]
+        return pd.concat(parts, ignore_index=True)
+
+    def _shift_students_table(self) -> Optional[pd.DataFrame]:
+        #кеш після переведення: прибрати випущені класи та зсунути паралелі; None - потрібна перебудова
+        table = self._students_table
+        keep = np.array([self.classes.get((cls.cohort, cls.vertical)) is cls for cls in self._table_classes],
+                        dtype=bool)
+        if keep.sum() != len(self.classes):  #з'явилися класи, яких немає в кеші (наприклад, після відкату)
+            return None
+        mask = keep[table['class_name'].cat.codes.to_numpy()]
+        table = table.loc[mask].reset_index(drop=True)
+        table['parallel'] += self.year_offset - self._table_offset
+        #усі класи зсуваються однаково, тому їх порядок не змінюється і досить перейменувати категорії
+        kept_names = [name for name, k in zip(table['class_name'].cat.categories, keep) if k]
+        self._table_classes = [cls for cls, k in zip(self._table_classes, keep) if k]
+        table['class_name'] = table['class_name'].cat.set_categories(kept_names).cat.rename_categories(
+            [cls.get_name() for cls in self._table_classes])
+        self._table_offset = self.year_offset
+        return table
+
+    def rollup(self, *dims: str) -> Dict[tuple, list]:
+        #зведення за вибраними вимірами з ROLLUP_DIMS: ключ -> [к-сть, сума балів, сума квадратів балів];
+        #обходить лише клітинки класів (стать x рік народження), тож не залежить від к-сті учнів
+        for dim in dims:
+            if dim not in ROLLUP_DIMS:
+                raise ValueError(f"Невідомий вимір зведення {dim}, є: {', '.join(ROLLUP_DIMS)}")
+        positions = [ROLLUP_DIMS.index(dim) for dim in dims]
+        by_class = all(dim in ('parallel', 'vertical') for dim in dims)  #досить підсумків класу, без клітинок
+        result: Dict[tuple, list] = {}
+        for cls in self.classes.values():
+            parallel, vertical, stats = cls.parallel, cls.vertical, cls.stats
+            if by_class:
+                if not stats.count:
+                    continue
+                cells = [((None, None), (stats.count, stats.grade_sum, stats.grade_sumsq))]
+            else:
+                cells = stats.cells.items()
+            for (gender, birth_year), (count, grade_sum, grade_sumsq) in cells:
+                row = (parallel, vertical, gender, birth_year)
+                key = tuple([row[i] for i in positions])
+                cell = result.get(key)
+                if cell is None:
+                    result[key] = [count, grade_sum, grade_sumsq]
+                else:
+                    cell[0] += count
+                    cell[1] += grade_sum
+                    cell[2] += grade_sumsq
+        return dict(sorted(result.items()))
+
+    def _save_rollup(self, classes_file: str, students_file: str) -> str:
+        #зведення разом з розміром і часом зміни вхідних файлів; повертає шлях.
+        #Викликається лише з load_data одразу після читання учнів: паралелі та показники класів тоді такі,
+        #як у файлах, а після переведення чи add_student зведення вже не відповідало б своїй позначці
+        path = rollup_path(students_file)
+        cells = [[cls.parallel, str(cls.vertical), gender, birth_year, *cell]
+                 for cls in self.ordered_classes() for (gender, birth_year), cell in cls.stats.cells.items()]
+        data = {'source': _files_stamp(classes_file, students_file), 'load_errors': self.load_errors, 'cells': cells}
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return path
+
+    @profiling.timed('load_rollup')
+    def _load_rollup(self, classes_file: str, students_file: str) -> bool:
+        #показники класів зі збереженого зведення без читання учнів; False - зведення немає або воно застаріле
+        path = rollup_path(students_file)
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get('source') != _files_stamp(classes_file, students_file):
+            return False
+        ingest = _StudentIngest(self, keep_students=False)
+        deltas: Dict[SchoolClass, ClassStats] = {}
+        for parallel, vertical, gender, birth_year, count, grade_sum, grade_sumsq in data['cells']:
+            cls = self.get_class(parallel, vertical)
+            if cls is None:
+                continue
+            delta = deltas.setdefault(cls, ClassStats())
+            delta.count += count
+            delta.grade_sum += grade_sum
+            delta.grade_sumsq += grade_sumsq
+            delta.genders[gender] = delta.genders.get(gender, 0) + count
+            delta.cells[(gender, birth_year)] = [count, grade_sum, grade_sumsq]
+        for cls, delta in deltas.items():
+            self.stats.add_to_class(cls, delta)
+        ingest.finish()
+        self.load_errors = [tuple(error) for error in data['load_errors']]
+        return True
+
+    def ordered_classes(self) -> List[SchoolClass]: #класи по порядку (1-А, 1-Б, 2-А...)
+        return sorted(self.classes.values(), key=lambda c: (c.parallel, c.vertical))
+
+    @profiling.timed('get_all_students_data', rows=lambda table, school: len(table))
+    def get_all_students_data(self) -> pd.DataFrame: #таблиця кешується, її не можна змінювати ззовні
+        #class_name - впорядкована категорія, її коди є позицією класу на графіках
+        if self._students_table is not None and self._table_offset != self.year_offset:
+            self._students_table = self._shift_students_table()
+        if self._students_table is None:
+            self._students_table = self._build_students_table()
+            self._pending_rows = []
+        elif self._pending_rows:
+            added = pd.DataFrame(self._pending_rows, columns=TABLE_COLUMNS)
+            added['class_name'] = pd.Categorical(added['class_name'],
+                                                 dtype=self._students_table['class_name'].dtype)
+            self._students_table = pd.concat([self._students_table, added], ignore_index=True)
+            self._pending_rows = []
+        return self._students_table
+
+    def student_index(self) -> StudentIndex: #індекси оновлюються при add_student, переведення їх не змінює
+        if self._student_index is None:
+            with profiling.stage('build_student_index'):
+                self._student_index = StudentIndex(self)
+        return self._student_index
+
+    @profiling.timed('search', rows=lambda found, *args, **kwargs: len(found))
+    def search(self, name_prefix: Optional[str] = None, birth_year: Optional[int] = None,
+               gender: Optional[str] = None, min_grade: Optional[float] = None, max_grade: Optional[float] = None,
+               limit: Optional[int] = None) -> List[Tuple[SchoolClass, Student]]:
+        #умови поєднуються через "і"; порядок - за ПІБ, якщо задано префікс, інакше за балом чи роком
+        index = self.student_index()
+        selections = []
+        if name_prefix:
+            selections.append(index.by_name_prefix(name_prefix))
+        if min_grade is not None or max_grade is not None:
+            selections.append(index.by_grade(-math.inf if min_grade is None else min_grade,
+                                             math.inf if max_grade is None else max_grade))
+        if birth_year is not None or gender is not None:
+            selections.append(index.by_birth(birth_year, gender))
+        if not selections:
+            ids = np.arange(len(index), dtype=np.int64)
+        else:
+            ids = selections[0]
+            for other in selections[1:]: #перетин зберігає порядок першої умови
+                ids = ids[np.isin(ids, other)]
+        ids = index.alive(ids, self)
+        if limit is not None:
+            ids = ids[:limit]
+        return index.resolve(ids)
+
+    def find_by_name(self, prefix: str) -> List[Student]: #за початком ПІБ, тобто насамперед прізвища
+        return [student for _, student in self.search(name_prefix=prefix)]
+
+    def find_by_birth_year(self, year: int, gender: Optional[str] = None) -> List[Student]:
+        return [student for _, student in self.search(birth_year=year, gender=gender)]
+
+    def find_by_grade(self, low: float, high: float) -> List[Student]: #low <= бал <= high
+        return [student for _, student in self.search(min_grade=low, max_grade=high)]
+
+    @profiling.timed('promote_all_classes')
+    def promote_all_classes(self, years: int = 1, on_year: Optional[Callable[[int], None]] = None) -> None:
+        #переведення - це зсув року школи та випуск одного потоку, учні та інші класи не змінюються;
+        #on_year(к-сть переведених років) викликається після кожного року, виняток з нього скасовує всі роки
+        self._before_write()
+        done = 0
+        try:
+            for _ in range(years):
+                graduating = list(self._cohorts.get(GRADUATION_PARALLEL - self.year_offset, []))
+                self._graduated.append([(cls, self._remove_class(cls)) for cls in graduating])  # 11-ті випускаються
+                self.year_offset += 1
+                done += 1
+                if on_year is not None:
+                    on_year(done)
+        except BaseException:
+            self.rollback_promotion(done)
+            raise
+        self._on_year_changed()
+
+    def rollback_promotion(self, years: int = 1) -> None: #скасування останніх переведень
+        self._before_write()
+        if years > len(self._graduated):
+            raise ValueError(f"Можна скасувати не більше {len(self._graduated)} переведень")
+        for _ in range(years):
+            self.year_offset -= 1
+            for cls, order in self._graduated.pop():
+                self._insert_class(cls, order)
+        self._on_year_changed()
+
+    def _on_year_changed(self) -> None:
+        self.version += 1
+        if self._pending_rows: #додані учні записані з назвами класів попереднього року
+            self._invalidate_students_table()
+
+
+def rollup_path(students_file: str) -> str:
+    return os.path.splitext(students_file)[0] + ROLLUP_SUFFIX
+
+
+def _files_stamp(*paths: str) -> list: #розмір і час зміни файлів: зведення дійсне, поки вони ті самі
+    return [[os.path.basename(path), os.stat(path).st_size, os.stat(path).st_mtime_ns] for path in paths]
+
+
+def stats_diff(before: School, after: School) -> Dict[str, Tuple[float, float]]:
+    #показники двох версій школи: назва -> (до, після); з накопичених показників класів, без обходу учнів
+    rows: Dict[str, Tuple[float, float]] = {
+        "Учнів": (before.stats.total, after.stats.total),
+        "Класів": (len(before.classes), len(after.classes)),
+        "Середній бал": (round(before.stats.mean_grade(), 2), round(after.stats.mean_grade(), 2)),
+        "Ст. відхилення балу": (round(before.stats.grade_std(), 2), round(after.stats.grade_std(), 2)),
+    }
+    for gender in sorted(set(before.stats.genders) | set(after.stats.genders)):
+        rows[gender] = (before.stats.genders.get(gender, 0), after.stats.genders.get(gender, 0))
+    per_parallel = []
+    for school in (before, after):
+        counts: Dict[int, int] = {}
+        for cls in school.classes.values():
+            counts[cls.parallel] = counts.get(cls.parallel, 0) + cls.stats.count
+        per_parallel.append(counts)
+    for parallel in sorted(set(per_parallel[0]) | set(per_parallel[1])):
+        rows[f"{parallel} паралель"] = (per_parallel[0].get(parallel, 0), per_parallel[1].get(parallel, 0))
+    return rows
@@ -1,106 +1,67 @@
+import hashlib
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional, Tuple
 import streamlit as st
 import os
 
+import charts
+import jobs
+import profiling
+import storage
+from school import School, stats_diff
 
 
-#ств класів для 1 сценарію
-class Student: #ств класу Учень, він зберігає дані та середню оцінку
-    def __init__(self, last_name: str, first_name: str, middle_name: str,
-                 birth_year: int, gender: str, average_grade: float):
-        self.last_name = last_name
-        self.first_name = first_name
-        self.middle_name = middle_name
-        self.birth_year = birth_year
-        self.gender = gender
-        self.average_grade = average_grade
+#доменні класи (Student, SchoolClass, School) - у school.py, тут лише інтерфейс streamlit
+SCATTER_LIMIT = 20_000  #з такої к-сті учнів графік успішності малюється зведеним, а не точками
+SEARCH_LIMIT = 200  #скільки знайдених учнів показувати в таблиці
+JOB_POLL_SECONDS = 0.5  #як часто сторінка опитує фонову задачу переведення
+GRADE_VIEWS = {"Авто": "auto", "Точки": "scatter", "Середнє ± відхилення": "mean", "Розмах по класах": "box",
+               "Щільність": "hist2d"}
 
-    def get_full_name(self) -> str: #повернення понвого імені учня
-        return f"{self.last_name} {self.first_name} {self.middle_name}"
 
+class DashboardSchool(School): #школа з виводом статистики та графіків у streamlit
+    def __init__(self, name: str, compact: bool = False):
+        super().__init__(name, compact)
+        self._aggregates: dict = {}  #дані графіків для поточної версії
+        self._aggregates_key: Optional[tuple] = None
 
-class SchoolClass: #ств класу у школі, він зберігає інфо про список учнів
-
-    def __init__(self, parallel: int, vertical: str):
-        self.parallel = parallel
-        self.vertical = vertical
-        self.students: List[Student] = []
-
-    def add_student(self, student: Student) -> None:  #додавання учня до класу
-        self.students.append(student)
-
-    def get_name(self) -> str:
-        return f"{self.parallel}-{self.vertical}" #повертатиме назву класу
-
-    def get_student_count(self) -> int:
-        return len(self.students) #повертатиме к-сть учнів у класі
-
-    def promote_class(self) -> None:
-        self.parallel += 1 #викор. під час переведення класу на наступний рік
-
-
-class School: #ств класу
-    def __init__(self, name: str):
-        self.name = name
-        self.classes: Dict[str, SchoolClass] = {}
-
-    def load_data(self, classes_file: str, students_file: str) -> None:
+    def load_data(self, classes_file: str, students_file: str, chunksize: Optional[int] = None,
+                  keep_students: bool = True, on_chunk: Optional[Callable[[int], None]] = None,
+                  rollup_cache: bool = False) -> None:
         try:
-            classes_df = pd.read_csv(classes_file)
-            for _, row in classes_df.iterrows():
-                p, v = int(row['parallel']), row['vertical']
-                self.classes[f"{p}{v}"] = SchoolClass(parallel=p, vertical=v)
-
-            students_df = pd.read_csv(students_file)
-            for _, row in students_df.iterrows():
-                student = Student(
-                    row['last_name'], row['first_name'], row['middle_name'],
-                    int(row['birth_year']), row['gender'], float(row['average_grade'])
-                )
-                key = f"{int(row['class_parallel'])}{row['class_vertical']}"
-                if key in self.classes:
-                    self.classes[key].add_student(student)
+            super().load_data(classes_file, students_file, chunksize, keep_students, on_chunk, rollup_cache)
         except Exception as e:
             st.error(f"Помилка завантаження: {e}")
 
-    def get_all_students_data(self) -> pd.DataFrame:
-        data = []
-        for cls in self.classes.values():
-            for s in cls.students:
-                data.append({
-                    'class_name': cls.get_name(),
-                    'parallel': cls.parallel,
-                    'vertical': cls.vertical,
-                    'gender': s.gender,
-                    'birth_year': s.birth_year,
-                    'average_grade': s.average_grade
-                })
-        return pd.DataFrame(data)
+    def promote_all_classes(self, years: int = 1, on_year: Optional[Callable[[int], None]] = None) -> None:
+        st.toast("Переводимо класи...")
+        super().promote_all_classes(years, on_year)
+        st.success(" Переведення класів")
 
+    @profiling.timed('display_statistics')
     def display_statistics(self, title: str) -> None:
         st.header(f" {title}")
         st.markdown("---")
 
-        students_df = self.get_all_students_data()
-        total_students = len(students_df)
+        total_students = self.stats.total  #показники вже пораховані, тут лише читання
+        figures = self._submit_charts()  #графіки малюються у фоні, поки виводяться метрики
 
         # 1. Основні метрики
         col1, col2, col3 = st.columns(3)
         col1.metric("Всього учнів", total_students)
 
-        if not students_df.empty:
-            g_counts = students_df['gender'].value_counts()
+        if total_students:
+            g_counts = self.stats.genders
             col2.metric("Хлопці", g_counts.get('Хлопець', 0))
             col3.metric("Дівчата", g_counts.get('Дівчина', 0))
 
         # 2. Інформація про макс/мін клас
         if self.classes:
-            max_class = max(self.classes.values(), key=lambda c: c.get_student_count())
+            max_class = self.stats.largest_class()
             max_count = max_class.get_student_count()
 
-            min_class = min(self.classes.values(), key=lambda c: c.get_student_count())
+            min_class = self.stats.smallest_class()
             min_count = min_class.get_student_count()
 
             st.info(f" **Найбільший клас:** {max_class.get_name()} ({max_count} учнів)")
@@ -109,103 +70,173 @@ class School: #ств класу
         # 3. ЗАМІНА ТАБЛИЦІ НА ГРАФІК (ОНОВЛЕНО)
         if self.classes:
             st.subheader(" Детальний розподіл по класах")
+            show_figure(figures['classes'])
+
+    def _chart_data(self, name: str, compute: Callable):
+        #агрегати для графіків рахуються раз на версію даних, з них же береться хеш для кешу картинок
+        if self._aggregates_key != self.cache_key():
+            self._aggregates = {}
+            self._aggregates_key = self.cache_key()
+        if name not in self._aggregates: #новий словник, а не зміна старого: фонова задача може саме копіювати школу
+            self._aggregates = {**self._aggregates, name: compute()}
+        return self._aggregates[name]
+
+    @profiling.timed('chart_aggregates')
+    def chart_aggregates(self) -> Dict[str, tuple]:
+        #дані графіків статистики: назва -> (функція малювання, її аргументи); без рендеру, тож працює й без streamlit
+        def class_counts():
+            ordered = self.ordered_classes()  # класи по порядку (1-А, 1-Б, 2-А...)
+            return {'names': [c.get_name() for c in ordered],
+                    'counts': np.array([c.get_student_count() for c in ordered], dtype=np.int64)}
+
+        #паралелі, роки народження та вертикалі - зі зведення школи, без обходу учнів
+        def parallels():
+            rollup = self.rollup('parallel')
+            return {'labels': [p for (p,) in rollup], 'values': np.array([cell[0] for cell in rollup.values()]),
+                    'color': 'skyblue', 'xlabel': "Паралель", 'ylabel': "Кількість"}
+
+        def birth_years():
+            rollup = self.rollup('birth_year')
+            return {'labels': [year for (year,) in rollup], 'values': np.array([cell[0] for cell in rollup.values()]),
+                    'color': 'forestgreen', 'xlabel': "Рік народження", 'ylabel': "Кількість"}
+
+        def verticals():            # розрахунок середнього для класів А і б
+            students = {str(v): cell[0] for (v,), cell in self.rollup('vertical').items()}
+            classes: Dict[str, int] = {}
+            for c in self.classes.values():  #порожні класи теж входять у середнє
+                classes[str(c.vertical)] = classes.get(str(c.vertical), 0) + 1
+            labels = sorted(classes)
+            return {'labels': labels, 'values': np.array([students.get(v, 0) / classes[v] for v in labels]),
+                    'color': 'coral', 'xlabel': "Вертикаль", 'ylabel': "Середня кількість учнів у класі",
+                    'figsize': (6, 4)}
+
+        specs = {'classes': (charts.draw_class_counts, self._chart_data('classes', class_counts))}
+        if self.stats.total:
+            for name, compute in [('parallels', parallels), ('birth_years', birth_years), ('verticals', verticals)]:
+                specs[name] = (charts.draw_bars, self._chart_data(name, compute))
+        return specs
+
+    def _submit_charts(self) -> Dict[str, "charts.Future"]:
+        #усі графіки, що не залежать від вибору користувача, одразу йдуть на рендер у фоні
+        return {name: charts.renderer.render(draw, data) for name, (draw, data) in self.chart_aggregates().items()}
+
+    def _submit_grade_chart(self, view: str) -> "charts.Future":
+        if view == 'mean': #з накопичених сум класів, тож не залежить від к-сті учнів
+            def mean_data():
+                ordered = self.ordered_classes()
+                stats = [c.stats for c in ordered]
+                means = np.array([s.grade_sum / s.count if s.count else np.nan for s in stats])
+                sumsq = np.array([s.grade_sumsq / s.count if s.count else np.nan for s in stats])
+                return charts.draw_grades_mean, {'labels': [c.get_name() for c in ordered], 'means': means,
+                                                 'stds': np.sqrt(np.maximum(sumsq - means * means, 0.0))}
+
+            draw, data = self._chart_data(('grades', view), mean_data)
+            return charts.renderer.render(draw, data)
+        df = self.get_all_students_data()
 
-            # Сортуємо класи, щоб вони йшли по порядку (1-А, 1-Б, 2-А...)
-            sorted_classes = sorted(self.classes.values(), key=lambda c: (c.parallel, c.vertical))
-
-            names = [c.get_name() for c in sorted_classes]
-            counts = [c.get_student_count() for c in sorted_classes]
-
-            # Будуємо графік
-            fig, ax = plt.subplots(figsize=(10, 5))
-            ax.bar(names, counts, color='royalblue', edgecolor='black')
-
-            ax.set_ylabel("Кількість учнів")
-            ax.set_title("Кількість учнів у кожному класі")
-            ax.set_ylim(0, max(counts) + 2)  # Трохи місця зверху
-            plt.xticks(rotation=45)  # Повертаємо підписи, щоб не злипалися
-
-            st.pyplot(fig)
-
-    def generate_visualizations(self) -> None:
+        def grade_data():
+            #позиція класу - код впорядкованої категорії, без копії таблиці та apply по рядках
+            labels = [str(name) for name in df['class_name'].cat.categories]
+            positions = df['class_name'].cat.codes.to_numpy()
+            grades = df['average_grade'].to_numpy()
+            if view == 'scatter':
+                return charts.draw_grades_scatter, {'labels': labels, 'positions': positions, 'grades': grades}
+            if view == 'box':
+                return charts.draw_grades_box, {'labels': labels,
+                                                'box_stats': _grade_box_stats(df['class_name'], df['average_grade'])}
+            return charts.draw_grades_density, {'labels': labels,
+                                                **charts.grade_density(positions, grades, len(labels))}
+
+        draw, data = self._chart_data(('grades', view), grade_data)
+        return charts.renderer.render(draw, data)
+
+    @profiling.timed('generate_visualizations')
+    def generate_visualizations(self, scatter_limit: int = SCATTER_LIMIT) -> None:
         st.subheader(" Графічний аналіз")
-        df = self.get_all_students_data()
-        if df.empty: return
+        if not self.stats.total: return
+
+        #вибір вигляду відомий ще до малювання радіокнопки, тож графік успішності рендериться разом з іншими
+        view_key = f"grade_view_{self.version}"
+        view = GRADE_VIEWS[st.session_state.get(view_key, next(iter(GRADE_VIEWS)))]
+        if view == 'auto': #точки лише для невеликих шкіл, інакше графік зі зведення
+            view = 'scatter' if self.stats.total <= scatter_limit else 'mean'
+        figures = self._submit_charts()
+        figures['grades'] = self._submit_grade_chart(view)
 
         tab1, tab2, tab3, tab4 = st.tabs(["Паралелі", "Роки народження", "Вертикалі", "Успішність"])
 
-        with tab1:
+        with tab1, profiling.stage('tab_parallels'):
             st.caption("Розподіл кількості учнів по паралелях")
-            fig, ax = plt.subplots(figsize=(8, 4))
-            df.groupby('parallel')['gender'].count().plot(kind='bar', ax=ax, color='skyblue')
-            ax.set_xlabel("Паралель")
-            ax.set_ylabel("Кількість")
-            st.pyplot(fig)
+            show_figure(figures['parallels'])
 
-        with tab2:
+        with tab2, profiling.stage('tab_birth_years'):
             st.caption("Кількість учнів за роком народження (НОВЕ)")
-            fig, ax = plt.subplots(figsize=(8, 4))
-            birth_counts = df['birth_year'].value_counts().sort_index()
-            birth_counts.plot(kind='bar', ax=ax, color='forestgreen')
-            ax.set_xlabel("Рік народження")
-            ax.set_ylabel("Кількість")
-            st.pyplot(fig)
-
-        with tab3:            # розрахунок середнього для класів А і б
+            show_figure(figures['birth_years'])
+
+        with tab3, profiling.stage('tab_verticals'):
             st.caption("Середня кількість учнів по вертикалях (НОВЕ)")
-            class_counts = []
-            for cls in self.classes.values():
-                class_counts.append({'vertical': cls.vertical, 'count': cls.get_student_count()})
+            show_figure(figures['verticals'])
 
-            df_vert = pd.DataFrame(class_counts)
-            avg_vert = df_vert.groupby('vertical')['count'].mean()
+        with tab4, profiling.stage('tab_grades'):
+            st.caption("Середня оцінка по класах")
+            st.radio("Вигляд", list(GRADE_VIEWS), horizontal=True, key=view_key)
+            show_figure(figures['grades'])
 
-            fig, ax = plt.subplots(figsize=(6, 4))
-            avg_vert.plot(kind='bar', ax=ax, color='coral')
-            ax.set_xlabel("Вертикаль")
-            ax.set_ylabel("Середня кількість учнів у класі")
-            st.pyplot(fig)
 
-        with tab4:
-            st.caption("Середня оцінка по класах")
-            unique_cls = sorted(self.classes.keys(), key=lambda k: (self.classes[k].parallel, self.classes[k].vertical))
-            mapping = {name: i for i, name in enumerate(unique_cls)}
+def _grade_box_stats(class_names: pd.Series, grades: pd.Series) -> List[dict]:
+    #зведення для ax.bxp по кожному класу: квартилі рахуються groupby, без окремих точок
+    groups = grades.groupby(class_names, observed=False)
+    quartiles = groups.quantile([0.25, 0.5, 0.75]).unstack()
+    stats = []
+    for name, (q1, med, q3), low, high, mean in zip(quartiles.index, quartiles.to_numpy(),
+                                                     groups.min(), groups.max(), groups.mean()):
+        iqr = q3 - q1
+        stats.append({'label': name, 'q1': q1, 'med': med, 'q3': q3, 'mean': mean,
+                      'whislo': max(low, q1 - 1.5 * iqr), 'whishi': min(high, q3 + 1.5 * iqr)})
+    return stats
 
-            labels = [self.classes[k].get_name() for k in unique_cls]
 
-            temp_df = df.copy()
-            temp_df['lookup_key'] = temp_df.apply(lambda x: f"{x['parallel']}{x['vertical']}", axis=1)
-            temp_df['sort_index'] = temp_df['lookup_key'].map(mapping)
+def show_figure(figure: "charts.Future") -> None: #чекає на картинку з пулу рендеру
+    st.image(figure.result(), width='stretch')
 
-            fig, ax = plt.subplots(figsize=(10, 5))
-            ax.scatter(temp_df['sort_index'], temp_df['average_grade'], alpha=0.5, c='purple')
-            ax.set_xticks(range(len(labels)))
-            ax.set_xticklabels(labels, rotation=90)
-            ax.set_xlabel("Клас")
-            ax.set_ylabel("Середній бал")
-            st.pyplot(fig)
 
-    def promote_all_classes(self) -> None:
-        st.toast("Переводимо класи...")
-        new_classes = {}
-        for key, cls in self.classes.items():
-            if cls.parallel == 11:
-                continue  # 11-ті випускаються
-            cls.promote_class()
-            new_key = f"{cls.parallel}{cls.vertical}"
-            new_classes[new_key] = cls
-        self.classes = new_classes
-        st.success(" Переведення класів")
+@st.cache_data(show_spinner=False)
+def _content_hash(path: str, mtime_ns: int, size: int) -> str:
+    #файл хешується лише коли змінився його час модифікації чи розмір
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_fingerprint(*paths: str) -> tuple: #mtime та хеш вмісту вхідних файлів
+    result = []
+    for path in paths:
+        stat = os.stat(path)
+        result.append((path, stat.st_mtime_ns, _content_hash(path, stat.st_mtime_ns, stat.st_size)))
+    return tuple(result)
+
+
+@st.cache_resource(show_spinner="Завантаження даних...")
+def load_school(name: str, classes_file: str, students_file: str, fingerprint: tuple) -> DashboardSchool:
+    #школа завантажується один раз на кожну версію файлів і спільна для всіх сесій, тому не змінюється;
+    #учні все одно тримаються в пам'яті всі, тож файл читається одним разом - це в рази швидше за потокове читання
+    school = DashboardSchool(name)
+    school.load_data(classes_file, students_file)
+    school.source = fingerprint
+    school.freeze()  #версії з переведенням створюються через fork()
+    return school
 
 
 #повний список від користувача
 def create_initial_csv_files():
-    #if os.path.exists('classes.csv') and os.path.exists('students.csv'):
-      # return
+    if os.path.exists('classes.csv') and os.path.exists('students.csv'):
+        return
 
  #ствоерння класів 1-11 та паралелей А і Б
     classes_data = [{'parallel': p, 'vertical': v} for p in range(1, 12) for v in ['А', 'Б']]
-    pd.DataFrame(classes_data).to_csv('classes.csv', index=False)
+    storage.write_table(pd.DataFrame(classes_data), 'classes.csv')
 
 #створення повного списку учнів
     cols = ['last_name', 'first_name', 'middle_name', 'birth_year', 'gender', 'average_grade', 'class_parallel',
@@ -284,29 +315,156 @@ def create_initial_csv_files():
         ['Чеснакова', 'Леся', 'Андріївна', 2010, 'Дівчина', 6.1, 10, 'Б'],
         ['Стефанчук', 'Володимир', 'Олександрович', 2010, 'Хлопець', 11.2, 10, 'Б'],
     ]
-    pd.DataFrame(data, columns=cols).to_csv('students.csv', index=False)
-
-
-
-if __name__ == "__main__":
-    st.set_page_config(page_title="School Manager", layout="wide")
+    storage.write_table(pd.DataFrame(data, columns=cols), 'students.csv')
+
+
+
+def profiling_sidebar() -> Optional[profiling.Recorder]: #налаштування замірів; None - заміри вимкнено
+    st.sidebar.subheader("⏱ Профілювання")
+    if not st.sidebar.toggle("Заміри етапів", key="profiling_on"):
+        return None
+    track_memory = st.sidebar.checkbox("Пікова пам'ять (tracemalloc, повільніше)", key="profiling_memory")
+    profile = st.sidebar.checkbox("cProfile всього перезапуску", key="profiling_cprofile")
+    return profiling.Recorder(track_memory=track_memory, profile=profile)
+
+
+def show_profiling(recorder: profiling.Recorder) -> None: #таблиця етапів останнього перезапуску
+    panel = st.sidebar  #панель виводиться після сторінки, тож містить заміри саме цього перезапуску
+    records = recorder.rows()
+    if not records:
+        panel.caption("Етапи не запускались (дані взято з кешу)")
+    else:
+        panel.dataframe(pd.DataFrame({
+            "Етап": [r.name for r in records],
+            "мс": [round(r.seconds * 1000, 1) for r in records],
+            "Викликів": [r.calls for r in records],
+            "Рядків": [r.rows for r in records],
+            "Пам., МБ": [None if r.peak_bytes is None else round(r.peak_bytes / 2 ** 20, 2) for r in records],
+        }), hide_index=True)
+    if recorder.profile_bytes() is not None:
+        panel.download_button("Завантажити cProfile (.prof)", recorder.profile_bytes(),
+                              file_name="dashboard.prof", mime="application/octet-stream")
+
+
+def show_search(school: School, limit: int = SEARCH_LIMIT) -> None: #пошук учнів через індекси школи
+    with st.expander("🔎 Пошук учнів"):
+        col1, col2, col3 = st.columns([2, 1, 1])
+        prefix = col1.text_input("Прізвище (початок ПІБ)", key="search_name").strip()
+        year = col2.number_input("Рік народження", min_value=1990, max_value=2030, value=None, step=1,
+                                 key="search_year")
+        gender = col3.selectbox("Стать", ["Усі", "Хлопець", "Дівчина"], key="search_gender")
+        low, high = st.slider("Середній бал", 0.0, 12.0, (0.0, 12.0), step=0.1, key="search_grade")
+        grade_filter = (low, high) != (0.0, 12.0)
+        if not (prefix or year is not None or gender != "Усі" or grade_filter):
+            st.caption("Задайте хоча б одну умову")
+            return
+        found = school.search(name_prefix=prefix or None, birth_year=None if year is None else int(year),
+                              gender=None if gender == "Усі" else gender,
+                              min_grade=low if grade_filter else None, max_grade=high if grade_filter else None,
+                              limit=limit + 1)
+        st.caption(f"Знайдено: {len(found) if len(found) <= limit else f'понад {limit}'}")
+        st.dataframe(pd.DataFrame([(cls.get_name(), student.get_full_name(), student.birth_year, student.gender,
+                                    student.average_grade) for cls, student in found[:limit]],
+                                  columns=["Клас", "ПІБ", "Рік народження", "Стать", "Середній бал"]),
+                     hide_index=True)
+
+
+def promoted_copy(job: jobs.Job, school: DashboardSchool, years: int = 1) -> DashboardSchool:
+    #фонова задача переведення: school лишається без змін, переводиться її версія зі спільними учнями
+    steps = years + 2
+    job.report(0, steps, "Копіюємо класи")
+    promoted = school.fork()
+    job.report(1, steps, "Переводимо класи")
+    #School.promote_all_classes - без st.toast, бо це не потік сторінки
+    School.promote_all_classes(promoted, years, on_year=lambda done: job.report(1 + done, steps))
+    job.report(1 + years, steps, "Рахуємо статистику")
+    promoted.freeze()
+    promoted._submit_charts()  #графіки починають малюватися ще до того, як сторінка їх попросить
+    return promoted
+
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def promotion_progress(job_id: int) -> None: #перемальовується лише цей блок, решта сторінки не чекає
+    job = jobs.runner.get(job_id)
+    if job is None or job.snapshot().finished:
+        st.rerun()  #результат показує вся сторінка
+    snapshot = job.snapshot()
+    st.progress(snapshot.fraction, text=f"{snapshot.message} ({snapshot.seconds:.1f} с)")
+    if st.button("Скасувати", key=f"cancel_promotion_{job_id}", disabled=job.cancel_requested):
+        job.cancel()
+
+
+def show_stats_diff(before: School, after: School) -> None: #зміни показників між двома версіями
+    rows = [(name, old, new, new - old) for name, (old, new) in stats_diff(before, after).items() if old != new]
+    st.dataframe(pd.DataFrame(rows, columns=["Показник", "До", "Після", "Зміна"]), hide_index=True)
+
+
+def show_promotion(school: DashboardSchool) -> Optional[Tuple[DashboardSchool, DashboardSchool]]:
+    #кожне переведення - окрема незмінна версія школи в сесії (учні в них спільні);
+    #повертає (попередня, вибрана) версії, якщо переведення вже було
+    st.subheader(" Виконати переведення") #кнопка щоб відбулося переведення
+    versions: List[DashboardSchool] = st.session_state.setdefault('school_versions', [])
+    if versions and versions[0].source != school.source:  #файли змінилися - версії застаріли
+        versions.clear()
+    job = jobs.runner.get(st.session_state.get('promotion_job', 0))
+    running = job is not None and not job.snapshot().finished
+    col1, col2 = st.columns(2)
+    if col1.button("Перевести учнів на наступний рік", disabled=running):
+        job = jobs.runner.submit("Переведення", promoted_copy, versions[-1] if versions else school, key=school.name)
+        st.session_state['promotion_job'] = job.id
+    if col2.button("Повернутися до поточного року", disabled=running or not versions):
+        versions.clear()  #вихідна школа не змінювалася, тож файли перечитувати не треба
+    if job is not None:
+        snapshot = job.snapshot()
+        if not snapshot.finished:
+            promotion_progress(job.id)
+            return None
+        del st.session_state['promotion_job']
+        if snapshot.status == jobs.DONE:
+            versions.append(snapshot.result)
+            st.success(f" Переведення класів ({snapshot.seconds:.1f} с)")
+        elif snapshot.status == jobs.CANCELLED:
+            st.info("Переведення скасовано")
+        else:
+            st.error(f"Помилка переведення: {snapshot.error}")
+    if not versions:
+        return None
+    years = st.select_slider("Років після поточного", options=list(range(1, len(versions) + 1)),
+                             value=len(versions)) if len(versions) > 1 else 1
+    return ([school] + versions)[years - 1], versions[years - 1]
+
+
+def render_page() -> None:
     create_initial_csv_files()
 
     st.title(" Терешківський ліцей ")
 
-    school = School("Терешківський ліцей")
-
-    school.load_data('classes.csv', 'students.csv')    #завантаження даних
+    school = load_school("Терешківський ліцей", 'classes.csv', 'students.csv',
+                         file_fingerprint('classes.csv', 'students.csv'))    #завантаження даних (з кешу)
+    if school.load_errors: #некоректні рядки пропущені, решта даних завантажена
+        with st.expander(f"Пропущено некоректних рядків у students.csv: {len(school.load_errors)}"):
+            st.dataframe(pd.DataFrame(school.load_errors, columns=["Рядок", "Причина"]), hide_index=True)
 
+    show_search(school)
     school.display_statistics("Статистика до переведення") #вивід статистики до оновлення
     school.generate_visualizations()
 
     st.markdown("---")
 
-    st.subheader(" Виконати переведення") #кнопка щоб відбулося переведення
-    if st.button("Перевести учнів на наступний рік"):
-        school.promote_all_classes()
+    promotion = show_promotion(school)
+    if promotion is not None:
+        previous, promoted = promotion
         st.markdown("---")
 
-        school.display_statistics("Статистика оновлена ") #статистика після переведення
-        school.generate_visualizations()
\ No newline at end of file
+        show_stats_diff(previous, promoted)
+        promoted.display_statistics("Статистика оновлена ") #статистика після переведення
+        promoted.generate_visualizations()
+
+
+if __name__ == "__main__":
+    st.set_page_config(page_title="School Manager", layout="wide")
+    recorder = profiling_sidebar()
+    with profiling.recording(recorder):
+        render_page()
+    if recorder is not None:
+        show_profiling(recorder)
@@ -0,0 +1,237 @@
+import argparse
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import storage
+from school import (CLASS_DTYPES, GRADUATION_PARALLEL, STREAM_CHUNKSIZE, STUDENT_DTYPES,
+                    School, SchoolClass, Student)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS schools (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS classes (
+    id INTEGER PRIMARY KEY,
+    school_id INTEGER NOT NULL REFERENCES schools(id) ON DELETE CASCADE,
+    parallel INTEGER NOT NULL,
+    vertical TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS students (
+    id INTEGER PRIMARY KEY,
+    class_id INTEGER NOT NULL REFERENCES classes(id) ON DELETE CASCADE,
+    last_name TEXT NOT NULL,
+    first_name TEXT NOT NULL,
+    middle_name TEXT NOT NULL,
+    birth_year INTEGER NOT NULL,
+    gender TEXT NOT NULL,
+    average_grade REAL NOT NULL
+);
+-- унікальність (школа, паралель, вертикаль) перевіряє код: UPDATE parallel + 1 при переведенні
+-- тимчасово дає однакові значення, і UNIQUE-індекс зупинив би його на першому ж рядку
+CREATE INDEX IF NOT EXISTS idx_classes_school_parallel ON classes(school_id, parallel, vertical);
+CREATE INDEX IF NOT EXISTS idx_students_class ON students(class_id);
+CREATE INDEX IF NOT EXISTS idx_students_birth_year ON students(birth_year);
+CREATE INDEX IF NOT EXISTS idx_students_gender ON students(gender);
+"""
+
+STUDENT_COLUMNS = ['last_name', 'first_name', 'middle_name', 'birth_year', 'gender', 'average_grade']
+
+
+class SqliteSchoolRepository: #зберігання шкіл у SQLite, показники рахуються запитами, а не обходом у Python
+    def __init__(self, path: str = ':memory:'):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # ---------- школи та класи ----------
+
+    def school_id(self, name: str, create: bool = True) -> int:
+        row = self.conn.execute("SELECT id FROM schools WHERE name = ?", (name,)).fetchone()
+        if row is not None:
+            return row[0]
+        if not create:
+            raise KeyError(f"Школу '{name}' не знайдено")
+        with self.conn:
+            return self.conn.execute("INSERT INTO schools(name) VALUES (?)", (name,)).lastrowid
+
+    def school_names(self) -> List[str]:
+        return [name for (name,) in self.conn.execute("SELECT name FROM schools ORDER BY id")]
+
+    def _class_ids(self, school_id: int) -> Dict[Tuple[int, str], int]:
+        rows = self.conn.execute("SELECT parallel, vertical, id FROM classes WHERE school_id = ?", (school_id,))
+        return {(p, v): class_id for p, v, class_id in rows}
+
+    def add_classes(self, school_id: int, classes: Iterable[Tuple[int, str]]) -> None:
+        existing = self._class_ids(school_id)
+        new = [(school_id, int(p), str(v)) for p, v in classes if (int(p), str(v)) not in existing]
+        with self.conn:
+            self.conn.executemany("INSERT INTO classes(school_id, parallel, vertical) VALUES (?, ?, ?)", new)
+
+    # ---------- завантаження ----------
+
+    def _insert_students(self, class_ids: Dict[Tuple[int, str], int], students_df: pd.DataFrame) -> int:
+        #клас кожного учня визначається без циклу по рядках, учні з невідомих класів пропускаються
+        keys = list(class_ids)
+        if not keys:
+            return 0
+        codes = pd.MultiIndex.from_tuples(keys).get_indexer(pd.MultiIndex.from_arrays([students_df['class_parallel'].astype('int64'),
+                                                             students_df['class_vertical'].astype(str)]))
+        known = codes >= 0
+        ids = np.array([class_ids[k] for k in keys], dtype=np.int64)[codes[known]]
+        part = students_df.loc[known, STUDENT_COLUMNS]
+        rows = zip(ids.tolist(), *(part[col].tolist() for col in STUDENT_COLUMNS))
+        self.conn.executemany(
+            "INSERT INTO students(class_id, last_name, first_name, middle_name, birth_year, gender, average_grade)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        return int(known.sum())
+
+    def import_files(self, name: str, classes_file: str, students_file: str,
+                     chunksize: int = STREAM_CHUNKSIZE) -> int:
+        #усі учні вставляються частинами через executemany в одній транзакції; повертає к-сть учнів.
+        #Учні школи замінюються, як у save_school, тож повторний імпорт тих самих файлів нічого не дублює
+        school_id = self.school_id(name)
+        classes_df = storage.read_table(classes_file, dtype=CLASS_DTYPES)
+        self.add_classes(school_id, zip(classes_df['parallel'].tolist(), classes_df['vertical'].tolist()))
+        class_ids = self._class_ids(school_id)
+        total = 0
+        with self.conn:
+            self.conn.execute("DELETE FROM students WHERE class_id IN (SELECT id FROM classes WHERE school_id = ?)",
+                              (school_id,))
+            for chunk in storage.iter_chunks(students_file, chunksize, dtype=STUDENT_DTYPES
+                                             if storage.file_format(students_file) == 'csv' else None):
+                total += self._insert_students(class_ids, chunk)
+        return total
+
+    def save_school(self, school: School) -> int: #запис школи з пам'яті (замінює попередні дані)
+        school_id = self.school_id(school.name)
+        classes = school.ordered_classes()
+        with self.conn:
+            self.conn.execute("DELETE FROM classes WHERE school_id = ?", (school_id,))
+            self.conn.executemany("INSERT INTO classes(school_id, parallel, vertical) VALUES (?, ?, ?)",
+                                  [(school_id, c.parallel, str(c.vertical)) for c in classes])
+            class_ids = self._class_ids(school_id)
+            rows = ((class_ids[(c.parallel, str(c.vertical))], s.last_name, s.first_name, s.middle_name,
+                     int(s.birth_year), s.gender, float(s.average_grade)) for c in classes for s in c.students)
+            self.conn.executemany(
+                "INSERT INTO students(class_id, last_name, first_name, middle_name, birth_year, gender, average_grade)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        return school_id
+
+    def load_school(self, name: str, compact: bool = False) -> School:
+        school_id = self.school_id(name, create=False)
+        school = School(name, compact=compact)
+        for p, v in self.conn.execute("SELECT parallel, vertical FROM classes WHERE school_id = ? "
+                                      "ORDER BY parallel, vertical", (school_id,)):
+            school.add_class(SchoolClass(parallel=p, vertical=v))
+        students_df = pd.read_sql_query(
+            "SELECT s.last_name, s.first_name, s.middle_name, s.birth_year, s.gender, s.average_grade,"
+            " c.parallel AS class_parallel, c.vertical AS class_vertical"
+            " FROM students s JOIN classes c ON c.id = s.class_id WHERE c.school_id = ? ORDER BY s.id",
+            self.conn, params=(school_id,))
+        school._attach_students(students_df.astype(STUDENT_DTYPES))
+        return school
+
+    # ---------- зміни ----------
+
+    def add_student(self, school_id: int, parallel: int, vertical: str, student: Student) -> None:
+        class_id = self._class_ids(school_id).get((parallel, vertical))
+        if class_id is None:
+            raise KeyError(f"Класу {parallel}-{vertical} немає")
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO students(class_id, last_name, first_name, middle_name, birth_year, gender, average_grade)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (class_id, student.last_name, student.first_name, student.middle_name,
+                 int(student.birth_year), student.gender, float(student.average_grade)))
+
+    def promote_all_classes(self, school_id: Optional[int] = None) -> None:
+        #випуск - один DELETE (учні видаляються каскадно), переведення решти - один UPDATE
+        where, params = self._school_filter(school_id)
+        with self.conn:
+            self.conn.execute(f"DELETE FROM classes WHERE parallel = ?{where}", (GRADUATION_PARALLEL,) + params)
+            self.conn.execute(f"UPDATE classes SET parallel = parallel + 1 WHERE 1 = 1{where}", params)
+
+    # ---------- показники ----------
+
+    @staticmethod
+    def _school_filter(school_id: Optional[int], alias: str = '') -> Tuple[str, tuple]:
+        #school_id=None - усі школи (показники району)
+        if school_id is None:
+            return "", ()
+        return f" AND {alias}school_id = ?", (school_id,)
+
+    def student_count(self, school_id: Optional[int] = None) -> int:
+        where, params = self._school_filter(school_id, 'c.')
+        return self.conn.execute("SELECT COUNT(*) FROM students s JOIN classes c ON c.id = s.class_id "
+                                 f"WHERE 1 = 1{where}", params).fetchone()[0]
+
+    def gender_counts(self, school_id: Optional[int] = None) -> Dict[str, int]:
+        where, params = self._school_filter(school_id, 'c.')
+        return dict(self.conn.execute("SELECT s.gender, COUNT(*) FROM students s JOIN classes c ON c.id = s.class_id "
+                                      f"WHERE 1 = 1{where} GROUP BY s.gender", params))
+
+    def counts_per_class(self, school_id: Optional[int] = None) -> List[Tuple[int, str, int]]:
+        #(паралель, вертикаль, к-сть учнів), включно з порожніми класами
+        where, params = self._school_filter(school_id, 'c.')
+        return self.conn.execute(
+            "SELECT c.parallel, c.vertical, COUNT(s.id) FROM classes c LEFT JOIN students s ON s.class_id = c.id "
+            f"WHERE 1 = 1{where} GROUP BY c.id ORDER BY c.parallel, c.vertical", params).fetchall()
+
+    def counts_per_parallel(self, school_id: Optional[int] = None) -> Dict[int, int]:
+        where, params = self._school_filter(school_id, 'c.')
+        return dict(self.conn.execute(
+            "SELECT c.parallel, COUNT(*) FROM students s JOIN classes c ON c.id = s.class_id "
+            f"WHERE 1 = 1{where} GROUP BY c.parallel ORDER BY c.parallel", params))
+
+    def counts_per_birth_year(self, school_id: Optional[int] = None) -> Dict[int, int]:
+        where, params = self._school_filter(school_id, 'c.')
+        return dict(self.conn.execute(
+            "SELECT s.birth_year, COUNT(*) FROM students s JOIN classes c ON c.id = s.class_id "
+            f"WHERE 1 = 1{where} GROUP BY s.birth_year ORDER BY s.birth_year", params))
+
+    def mean_vertical_size(self, school_id: Optional[int] = None) -> Dict[str, float]:
+        where, params = self._school_filter(school_id, 'c.')
+        return dict(self.conn.execute(
+            "SELECT vertical, AVG(n) FROM (SELECT c.vertical AS vertical, COUNT(s.id) AS n FROM classes c "
+            f"LEFT JOIN students s ON s.class_id = c.id WHERE 1 = 1{where} GROUP BY c.id) "
+            "GROUP BY vertical ORDER BY vertical", params))
+
+    def grade_summary(self, school_id: Optional[int] = None) -> Tuple[int, float, float]:
+        #(к-сть, сума оцінок, сума квадратів оцінок) - з них рахуються середнє та відхилення
+        where, params = self._school_filter(school_id, 'c.')
+        count, total, sumsq = self.conn.execute(
+            "SELECT COUNT(*), TOTAL(s.average_grade), TOTAL(s.average_grade * s.average_grade) "
+            f"FROM students s JOIN classes c ON c.id = s.class_id WHERE 1 = 1{where}", params).fetchone()
+        return count, total, sumsq
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Імпорт школи в SQLite та показники з бази")
+    parser.add_argument("database", help="файл бази, наприклад school.db")
+    parser.add_argument("--import", dest="files", nargs=2, metavar=("CLASSES", "STUDENTS"),
+                        help="імпортувати класи та учнів з файлів")
+    parser.add_argument("--name", default="Терешківський ліцей", help="назва школи")
+    parser.add_argument("--promote", action="store_true", help="перевести школу на наступний рік")
+    args = parser.parse_args()
+
+    repo = SqliteSchoolRepository(args.database)
+    school_id = repo.school_id(args.name)
+    if args.files:
+        print(f"Імпортовано учнів: {repo.import_files(args.name, *args.files)}")
+    if args.promote:
+        repo.promote_all_classes(school_id)
+    print(f"Всього учнів: {repo.student_count(school_id)}")
+    print(f"За статтю: {repo.gender_counts(school_id)}")
+    print(f"По паралелях: {repo.counts_per_parallel(school_id)}")
+    print(f"Середня к-сть учнів по вертикалях: {repo.mean_vertical_size(school_id)}")
+    repo.close()
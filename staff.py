@@ -0,0 +1,80 @@
+from __future__ import annotations  #numpy потрібен лише тому, хто передає масиви в calculate_salaries
+
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class Employee: #свт. класу для всіх працівників ліцею(загальні атрибути та поліморфізм)
+    __slots__ = ('full_name', 'base_salary', 'salary', 'bonus')
+    experience_fields: tuple = ()  #атрибути стажу, потрібні для пакетного розрахунку
+
+    def __init__(self, full_name: str, base_salary: float):
+        self.full_name = full_name
+        self.base_salary = base_salary
+        self.salary: Optional[float] = None
+        self.bonus: float = 0.0
+
+    def calculate_salary(self) -> float:
+        raise NotImplementedError
+
+    @staticmethod
+    def calculate_salaries(base_salary: np.ndarray, *experience: np.ndarray) -> np.ndarray:
+        #та сама формула, що й calculate_salary, але для масивів (порядок операцій збігається)
+        raise NotImplementedError
+
+
+class Teacher(Employee): #вчитель успадковує Employee
+    __slots__ = ('teaching_experience',)
+    experience_fields = ('teaching_experience',)
+
+    def __init__(self, full_name: str, base_salary: float, teaching_experience: int):
+        super().__init__(full_name, base_salary)
+        self.teaching_experience = teaching_experience
+
+    def calculate_salary(self) -> float: #оброхування зп вчителів
+        self.salary = self.base_salary * self.teaching_experience / 30.0
+        return self.salary
+
+    @staticmethod
+    def calculate_salaries(base_salary: np.ndarray, teaching_experience: np.ndarray) -> np.ndarray:
+        return base_salary * teaching_experience / 30.0
+
+
+class SecurityGuard(Employee): #охоронець так само успадковує Employee
+    __slots__ = ('total_experience',)
+    experience_fields = ('total_experience',)
+
+    def __init__(self, full_name: str, base_salary: float, total_experience: int):
+        super().__init__(full_name, base_salary)
+        self.total_experience = total_experience
+
+    def calculate_salary(self) -> float:# зп охоронця
+        self.salary = self.base_salary + self.total_experience * 250.0
+        return self.salary
+
+    @staticmethod
+    def calculate_salaries(base_salary: np.ndarray, total_experience: np.ndarray) -> np.ndarray:
+        return base_salary + total_experience * 250.0
+
+
+class Director(Employee):  #директор також успадковує Employee
+    __slots__ = ('teaching_experience', 'management_experience')
+    experience_fields = ('teaching_experience', 'management_experience')
+
+    def __init__(self, full_name: str, base_salary: float, teaching_experience: int, management_experience: int):
+        super().__init__(full_name, base_salary)
+        self.teaching_experience = teaching_experience
+        self.management_experience = management_experience
+
+    def calculate_salary(self) -> float: #розрахунок зп директора
+        self.salary = (self.base_salary * self.teaching_experience / 50.0 +
+                       self.management_experience * 500.0)
+        return self.salary
+
+    @staticmethod
+    def calculate_salaries(base_salary: np.ndarray, teaching_experience: np.ndarray,
+                           management_experience: np.ndarray) -> np.ndarray:
+        return (base_salary * teaching_experience / 50.0 +
+                management_experience * 500.0)
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import itertools
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from lazy import lazy_import
+
+pd = lazy_import('pandas')  #завантажується при першому читанні чи записі таблиці
+
+
+#формат файлу визначається за розширенням
+FORMATS = {
+    '.csv': 'csv',
+    '.feather': 'feather',
+    '.arrow': 'feather',
+    '.ipc': 'feather',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+}
+
+
+def file_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"Невідомий формат файлу {path}, підтримуються: {', '.join(sorted(FORMATS))}")
+    return FORMATS[ext]
+
+
+def _require_pyarrow(fmt: str):
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError(f"Для формату {fmt} потрібен пакет pyarrow (pip install pyarrow)") from None
+    return pyarrow
+
+
+def _apply_dtypes(df: pd.DataFrame, dtype: Optional[Dict[str, str]]) -> pd.DataFrame:
+    #колонкові формати вже типізовані, тут лише приведення до тих самих типів, що й для csv
+    if dtype:
+        df = df.astype({col: t for col, t in dtype.items() if col in df.columns and str(df[col].dtype) != t})
+    return df
+
+
+def read_table(path: str, dtype: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    fmt = file_format(path)
+    if fmt == 'csv':
+        return pd.read_csv(path, dtype=dtype)
+    _require_pyarrow(fmt)
+    if fmt == 'feather':
+        from pyarrow import feather
+        #memory_map: числові колонки читаються з файлу без копіювання
+        table = feather.read_table(path, memory_map=True)
+        return _apply_dtypes(table.to_pandas(), dtype)
+    return _apply_dtypes(pd.read_parquet(path), dtype)
+
+
+def iter_chunks(path: str, chunksize: int, **csv_options) -> Iterator[pd.DataFrame]:
+    #читання частинами; для csv додаткові параметри передаються в pd.read_csv
+    fmt = file_format(path)
+    if fmt == 'csv':
+        yield from pd.read_csv(path, chunksize=chunksize, **csv_options)
+        return
+    _require_pyarrow(fmt)
+    if fmt == 'feather':
+        import pyarrow as pa
+        with pa.memory_map(path) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                for start in range(0, batch.num_rows, chunksize):
+                    yield batch.slice(start, chunksize).to_pandas()
+        return
+    from pyarrow import parquet
+    for batch in parquet.ParquetFile(path).iter_batches(batch_size=chunksize):
+        yield batch.to_pandas()
+
+
+def iter_csv_checked(path: str, chunksize: int) -> Iterator[Tuple[pd.DataFrame, List[Tuple[int, str]]]]:
+    #читання csv частинами через csv.reader: к-сть полів перевіряється в кожному рядку, незалежно від меж частин
+    #(парсер pandas з chunksize мовчки обрізає зайві поля рядка, що починає частину).
+    #Повертає частини як рядки (порожні поля - NaN) з індексом = номер рядка у файлі та рядки з неправильною
+    #к-стю полів: (номер рядка, причина)
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        width = len(header)
+        numbered: Optional[Iterator[Tuple[int, List[str]]]] = None  #запис за записом, коли є багаторядкові поля
+        records = 0
+        while True:
+            if numbered is None:
+                first_line = reader.line_num + 1
+                batch = list(itertools.islice(reader, chunksize))
+                if not batch:
+                    return
+                if reader.line_num - first_line + 1 == len(batch):  #кожен запис в одному рядку файлу
+                    lines = range(first_line, reader.line_num + 1)
+                else:  #поле в лапках з переносом рядка: далі номери рядків рахуються для кожного запису
+                    lines = _record_lines(path, records, len(batch))
+                    numbered = _numbered(reader)
+            else:
+                pairs = list(itertools.islice(numbered, chunksize))
+                if not pairs:
+                    return
+                lines, batch = [line for line, _ in pairs], [row for _, row in pairs]
+            records += len(batch)
+            bad: List[Tuple[int, str]] = []
+            if any(len(row) != width for row in batch):
+                good = [i for i, row in enumerate(batch) if len(row) == width]
+                bad = [(lines[i], f"очікувалось {width} полів, а не {len(row)}")
+                       for i, row in enumerate(batch) if row and len(row) != width]  #порожні рядки просто пропускаються
+                batch = [batch[i] for i in good]
+                lines = [lines[i] for i in good]
+            frame = pd.DataFrame(batch, columns=header, index=lines, dtype=object)
+            yield frame.mask(frame == ''), bad
+
+
+def read_csv_checked(path: str) -> Tuple[pd.DataFrame, List[Tuple[int, str]]]:
+    #увесь csv як одна частина iter_csv_checked, але парсером pandas на C, що в рази швидше за csv.reader.
+    #Його результат приймається, лише коли кожен запис займає рівно один рядок файлу і має всі поля;
+    #інакше (зайві чи пропущені поля, порожні рядки, переноси в лапках) файл перечитується через csv.reader,
+    #щоб номери рядків і причини помилок були ті самі
+    try:
+        frame = pd.read_csv(path, dtype=object, keep_default_na=False, na_values=[''], skip_blank_lines=False,
+                            encoding='utf-8-sig')
+    except pd.errors.ParserError:
+        frame = None
+    if frame is not None and not frame.iloc[:, -1].isna().any():
+        with open(path, 'rb') as f:
+            chunks = iter(lambda: f.read(1 << 20), b'')
+            newlines = last = 0
+            for chunk in chunks:
+                newlines += chunk.count(b'\n')
+                last = chunk[-1]
+        lines = newlines + (last != ord('\n'))  #останній рядок може бути без переносу
+        if lines == len(frame) + 1:
+            frame.index = pd.RangeIndex(2, 2 + len(frame))
+            return frame, []
+    parts = list(iter_csv_checked(path, chunksize=1 << 20))
+    if not parts:
+        return pd.read_csv(path, dtype=object), []
+    return pd.concat([frame for frame, _ in parts]), [line for _, bad in parts for line in bad]
+
+
+def _numbered(reader) -> Iterator[Tuple[int, List[str]]]: #(рядок, з якого почався запис, запис)
+    line = reader.line_num
+    for row in reader:
+        yield line + 1, row
+        line = reader.line_num
+
+
+def _record_lines(path: str, skip: int, count: int) -> List[int]:
+    #рядки, з яких починаються count записів після перших skip; файл перечитується один раз
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        next(reader)
+        records = itertools.islice(_numbered(reader), skip, skip + count)
+        return [line for line, _ in records]
+
+
+def write_table(df: pd.DataFrame, path: str) -> None:
+    fmt = file_format(path)
+    if fmt == 'csv':
+        df.to_csv(path, index=False, encoding='utf-8')
+        return
+    _require_pyarrow(fmt)
+    #рядкові колонки зберігаються словником (кожне значення один раз), як категорії pandas
+    df = df.astype({col: 'category' for col in df.columns if df[col].dtype == object or df[col].dtype == 'string'
+                    or str(df[col].dtype) == 'str'})
+    tmp_path = path + '.tmp'
+    if fmt == 'feather':
+        df.reset_index(drop=True).to_feather(tmp_path, compression='uncompressed')  #без стиснення для memory map
+    else:
+        df.to_parquet(tmp_path, index=False, use_dictionary=True)
+    os.replace(tmp_path, path)
+
+
+def convert(src: str, dst: str) -> int: #перетворення файлу з одного формату в інший, повертає к-сть рядків
+    df = read_table(src)
+    write_table(df, dst)
+    return len(df)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Перетворення таблиць між csv, feather та parquet")
+    parser.add_argument("src", help="вхідний файл, наприклад students.csv")
+    parser.add_argument("dst", help="вихідний файл, наприклад students.feather")
+    args = parser.parse_args()
+    rows = convert(args.src, args.dst)
+    print(f"✅ {args.src} -> {args.dst}: {rows} рядків")
@@ -0,0 +1,13 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def data_files():
+    #класи та учні з прикладу в корені репозиторію
+    return os.path.join(ROOT, 'classes.csv'), os.path.join(ROOT, 'students.csv')
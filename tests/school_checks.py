@@ -0,0 +1,29 @@
+#спільні перевірки стану школи для тестів
+
+from school import School
+
+
+def load_school(data_files, compact=False, chunksize=None) -> School:
+    school = School('test', compact=compact)
+    school.load_data(*data_files, chunksize=chunksize)
+    return school
+
+
+def school_students(school):
+    #учні за класами в поточному році; те саме має бути в таблиці учнів та в пошуку
+    return sorted((cls.parallel, str(cls.vertical), student.get_full_name(), int(student.birth_year),
+                   student.gender, float(student.average_grade))
+                  for cls in school.ordered_classes() for student in cls.students)
+
+
+def check_consistent(school):
+    students = school_students(school)
+    table = school.get_all_students_data()
+    assert sorted(zip(table['parallel'].astype(int), table['vertical'].astype(str), table['birth_year'].astype(int),
+                      table['gender'], table['average_grade'].astype(float))) == \
+        sorted((p, v, year, gender, grade) for p, v, _, year, gender, grade in students)
+    found = school.search()
+    assert sorted((cls.parallel, str(cls.vertical), student.get_full_name()) for cls, student in found) == \
+        sorted((p, v, name) for p, v, name, *_ in students)
+    assert school.stats.total == len(students)
+    return students
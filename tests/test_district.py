@@ -0,0 +1,42 @@
+import shutil
+
+import pytest
+
+from district import District, SchoolSource
+from school import School
+
+
+@pytest.fixture
+def source(data_files, tmp_path):
+    #зведення школи пишеться поруч з файлами, тож вони копіюються
+    classes_file, students_file = (shutil.copy(path, tmp_path) for path in data_files)
+    return SchoolSource('Школа', classes_file, students_file)
+
+
+def test_load_keeps_manifest_order_with_same_names(source, tmp_path):
+    missing = SchoolSource('Школа', source.classes_file, str(tmp_path / 'missing.csv'))
+    other = SchoolSource('Інша', source.classes_file, source.students_file)
+    district = District('Район', [missing, other, source])
+    summaries = district.load(max_workers=2)
+    assert [(s.name, s.error is None) for s in summaries] == [('Школа', False), ('Інша', True), ('Школа', True)]
+
+
+def test_totals_and_counts_add_up_schools(source, tmp_path):
+    school = School('Школа')
+    school.load_data(source.classes_file, source.students_file)
+    per_parallel = {}
+    for cls in school.ordered_classes():
+        per_parallel[cls.parallel] = per_parallel.get(cls.parallel, 0) + len(cls.students)
+    missing = SchoolSource('Без учнів', source.classes_file, str(tmp_path / 'missing.csv'))
+
+    district = District('Район', [source, missing, SchoolSource('Копія', source.classes_file, source.students_file)])
+    for _ in range(2):  #удруге зведення читаються з students.rollup.json
+        district.load(max_workers=1)
+        totals = district.totals()
+        assert totals['schools'] == 2 and totals['classes'] == 2 * len(school.classes)
+        assert totals['total'] == 2 * school.stats.total == 144
+        assert totals['genders'] == {g: 2 * n for g, n in school.stats.genders.items()}
+        assert totals['mean_grade'] == pytest.approx(school.stats.grade_sum / school.stats.total)
+        assert totals['load_errors'] == 0
+        assert district.counts_per_parallel().to_dict() == {p: 2 * n for p, n in per_parallel.items()}
+        assert [name for name, _ in district.failed()] == ['Без учнів']
@@ -0,0 +1,25 @@
+import threading
+
+from jobs import CANCELLED, DONE, JobRunner
+
+
+def test_jobs_with_one_key_do_not_hold_other_keys():
+    runner = JobRunner(max_workers=2)
+    release = threading.Event()
+    order = []
+
+    def blocked(job, n):
+        release.wait(5)
+        order.append(n)
+        return n
+
+    same_key = [runner.submit('promote', blocked, n, key='schoolA') for n in range(4)]
+    other = runner.submit('payroll', lambda job: 'paid', key='schoolB')
+    assert other.wait(5).result == 'paid'  #жодна з задач schoolA не займає другого потоку
+    assert [job.snapshot().status for job in same_key[1:]] == ['pending'] * 3
+
+    same_key[2].cancel()
+    release.set()
+    assert [job.wait(5).status for job in same_key] == [DONE, DONE, CANCELLED, DONE]
+    assert order == [0, 1, 3]
+    runner.shutdown()
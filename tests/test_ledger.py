@@ -0,0 +1,82 @@
+import os
+
+import pytest
+
+from ledger import PART_SUFFIX, PayrollLedger
+
+HEADER = ['ПІБ', 'Посада', 'Оклад', 'Бонус', 'До видачі']
+ROWS = [['Коваль І.П.', 'Teacher', 12000.0, 100.0, 12100.0],
+        ['Шевченко, Т. "Кобзар"', 'Director', 15000.0, 100.0, 15100.5],  #кома й лапки - поле в лапках
+        ['Коваль І.П.', 'Teacher', 500.0, 100.0, 600.0],
+        ['Бойко О.О.', 'SecurityGuard', 11000.0, 100.0, 11100.0]]
+
+
+def _write(ledger, period, rows=ROWS, **kwargs):
+    writer = ledger.open_period(period, HEADER, flush_rows=2, **kwargs)
+    writer.write(rows[0])
+    writer.write_many(rows[1:])
+    return writer
+
+
+def _history(ledger, employee):
+    return [(p.period, p.total, ledger.read_row(p)) for p in ledger.payouts(employee)]
+
+
+def test_payouts_point_at_their_rows(tmp_path):
+    ledger = PayrollLedger(str(tmp_path))
+    _write(ledger, '2026-01').commit()
+    _write(ledger, '2026-02', ROWS[:2]).commit()
+
+    assert ledger.periods() == ['2026-01', '2026-02']
+    as_text = [[str(value) for value in row] for row in ROWS]
+    assert _history(ledger, 'Коваль І.П.') == [('2026-01', 12100.0, as_text[0]), ('2026-01', 600.0, as_text[2]),
+                                               ('2026-02', 12100.0, as_text[0])]
+    assert _history(ledger, 'Шевченко, Т. "Кобзар"') == [('2026-01', 15100.5, as_text[1]),
+                                                          ('2026-02', 15100.5, as_text[1])]
+    assert ledger.payouts('Нема Такого') == []
+
+
+def test_existing_period_is_not_overwritten(tmp_path):
+    ledger = PayrollLedger(str(tmp_path))
+    _write(ledger, '2026-03').commit()
+    before = (tmp_path / '2026-03.csv').read_bytes()
+    with pytest.raises(FileExistsError):
+        ledger.open_period('2026-03', HEADER)
+    assert (tmp_path / '2026-03.csv').read_bytes() == before
+    assert len(ledger.payouts('Бойко О.О.')) == 1
+
+
+def test_abort_rolls_back_index(tmp_path):
+    ledger = PayrollLedger(str(tmp_path))
+    _write(ledger, '2026-04').commit()
+    writer = _write(ledger, '2026-05')  #flush_rows=2: частина виплат уже в незафіксованій транзакції
+    writer.abort()
+
+    assert not (tmp_path / '2026-05.csv').exists()
+    assert (tmp_path / ('2026-05.csv' + PART_SUFFIX)).read_text(encoding='utf-8').count('Коваль') == 2
+    assert ledger.periods() == ['2026-04']
+    assert [p.period for p in ledger.payouts('Коваль І.П.')] == ['2026-04', '2026-04']
+    ledger.close()
+    assert PayrollLedger(str(tmp_path)).periods() == ['2026-04']  #.part при відкритті не індексується
+
+
+def test_recover_indexes_renamed_period(tmp_path, monkeypatch):
+    ledger = PayrollLedger(str(tmp_path))
+    _write(ledger, '2026-06').commit()
+    expected = _history(ledger, 'Коваль І.П.')
+
+    def crash(*args):  #збій після перейменування файлу, але до фіксації індексу
+        raise RuntimeError("збій")
+
+    writer = _write(ledger, '2026-07')
+    monkeypatch.setattr(ledger, '_finish_period', crash)
+    with pytest.raises(RuntimeError):
+        writer.commit()
+    ledger.close()
+    assert os.path.exists(tmp_path / '2026-07.csv')
+
+    reopened = PayrollLedger(str(tmp_path))
+    assert reopened.periods() == ['2026-06', '2026-07']
+    assert _history(reopened, 'Коваль І.П.') == expected + [('2026-07', total, row) for _, total, row in expected]
+    size = os.path.getsize(tmp_path / '2026-07.csv')
+    assert reopened.conn.execute("SELECT rows, size FROM periods WHERE period = '2026-07'").fetchone() == (4, size)
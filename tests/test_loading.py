@@ -0,0 +1,80 @@
+import pytest
+
+from school import School
+from school_checks import check_consistent, load_school
+
+
+def _with_line(students_file, tmp_path, line: int, text: str) -> str: #копія students.csv з рядком text на місці line
+    with open(students_file, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    lines.insert(line - 1, text)
+    path = tmp_path / 'students.csv'
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('compact', [False, True])
+@pytest.mark.parametrize('chunksize', [2, 3, 4, 5, 1000])
+def test_stream_reports_long_row_on_any_chunk_boundary(data_files, tmp_path, compact, chunksize):
+    #рядок 10 - дев'ятий запис, тобто початок частини при chunksize 2 і 4
+    classes_file, students_file = data_files
+    bad = _with_line(students_file, tmp_path, 10, 'Зайвий,Учень,Іванович,2015,Хлопець,10.0,5,А,x,y')
+    school = School('test', compact=compact)
+    school.load_data(classes_file, bad, chunksize=chunksize)
+    assert school.stats.total == 72
+    assert [line for line, _ in school.load_errors] == [10]
+
+
+def test_stream_line_numbers_after_skipped_rows(data_files, tmp_path):
+    classes_file, students_file = data_files
+    path = _with_line(students_file, tmp_path, 5, 'a,b,c')
+    with open(path, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    fields = lines[19].split(',')
+    fields[5] = 'abc'  #середня оцінка
+    lines[19] = ','.join(fields)
+    (tmp_path / 'students.csv').write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+    school = School('test')
+    school.load_data(classes_file, path, chunksize=4)
+    assert [line for line, _ in school.load_errors] == [5, 20]
+    assert school.stats.total == 71
+
+
+@pytest.mark.parametrize('text, errors, total', [
+    ('', [], 72),  #порожній рядок пропускається
+    ('Короткий,Рядок,Іванович,2015,Хлопець,10.0,5', [7], 72),
+    ('Зайвий,Учень,Іванович,2015,Хлопець,10.0,5,А,x', [7], 72),
+    ('Погана,Оцінка,Іванович,2015,Хлопець,abc,5,А', [7], 72),
+    ('"Прізвище\nз переносом",Учень,Іванович,2015,Хлопець,10.0,5,А', [], 73),
+])
+def test_whole_file_load_reports_same_errors_as_stream(data_files, tmp_path, text, errors, total):
+    classes_file, students_file = data_files
+    path = _with_line(students_file, tmp_path, 7, text)
+    with open(path, encoding='utf-8') as f:  #помилка в рядку після вставленого теж має свій номер
+        lines = f.read().splitlines()
+    fields = lines[-1].split(',')
+    fields[3] = '20x5'  #рік народження
+    (tmp_path / 'students.csv').write_text('\n'.join(lines[:-1] + [','.join(fields)]) + '\n', encoding='utf-8')
+    last = len(lines)
+
+    whole, streamed = School('test'), School('test')
+    whole.load_data(classes_file, path)
+    streamed.load_data(classes_file, path, chunksize=3)
+    assert whole.load_errors == streamed.load_errors
+    assert [line for line, _ in whole.load_errors] == errors + [last]
+    assert whole.stats.total == streamed.stats.total == total - 1
+
+
+@pytest.mark.parametrize('compact', [False, True])
+@pytest.mark.parametrize('chunksize', [1, 7, 50, 1000])
+def test_chunked_load_matches_whole_file(data_files, compact, chunksize):
+    whole = load_school(data_files, compact)
+    chunked = load_school(data_files, compact, chunksize)
+    assert check_consistent(chunked) == check_consistent(whole)
+    assert chunked.load_errors == whole.load_errors == []
+    for dims in (('parallel',), ('vertical', 'gender'), ('birth_year',)):
+        assert chunked.rollup(*dims).keys() == whole.rollup(*dims).keys()
+        assert all(chunked.rollup(*dims)[k][0] == v[0] and chunked.rollup(*dims)[k][1] == pytest.approx(v[1])
+                   for k, v in whole.rollup(*dims).items())
+    assert chunked.stats.mean_grade() == pytest.approx(whole.stats.mean_grade())
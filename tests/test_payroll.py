@@ -0,0 +1,50 @@
+import importlib
+import math
+
+import numpy as np
+import pytest
+
+from staff import Director, SecurityGuard, Teacher
+
+scenario = importlib.import_module('2_scenario')  #ім'я модуля починається з цифри
+
+
+def _system():
+    app = scenario.AccountingSystem()
+    app.employees = [Director("Д", 15000.0, teaching_experience=25, management_experience=10),
+                     Teacher("В1", 12000.0, teaching_experience=15), SecurityGuard("О", 11000.0, total_experience=5),
+                     Teacher("В2", 12345.0, teaching_experience=7), Teacher("В3", 9999.0, teaching_experience=0)]
+    return app
+
+
+def test_batch_payroll_matches_per_object():
+    single, batch = _system(), _system()
+    assert list(batch.iter_payroll_batch(512.35)) == list(single.iter_payroll(512.35))
+    assert [(e.salary, e.bonus) for e in batch.employees] == [(e.salary, e.bonus) for e in single.employees]
+
+
+def test_round_cents_matches_round():
+    values = np.array([2.675, 1.005, 0.125, 0.375, 1e8 + 0.005, 0.0, 523.3333333333334])
+    assert scenario.round_cents(values) == [round(v, 2) for v in values.tolist()]
+
+
+def test_batch_payroll_file_is_identical(tmp_path):
+    single, batch = _system(), _system()
+    single.run_salary_process(100.0, output=str(tmp_path / 'single.csv'), verbose=False)
+    batch.run_salary_process(100.0, batch=True, output=str(tmp_path / 'batch.csv'), verbose=False)
+    assert (tmp_path / 'single.csv').read_bytes() == (tmp_path / 'batch.csv').read_bytes()
+
+
+@pytest.mark.parametrize('bonus', [-1.0, math.nan, math.inf])
+def test_run_rejects_bad_bonus(tmp_path, bonus):
+    output = tmp_path / 'salaries.csv'
+    with pytest.raises(ValueError):
+        _system().run_salary_process(bonus, output=str(output), verbose=False)
+    assert not output.exists()
+
+
+def test_ask_bonus_repeats_on_non_finite(monkeypatch, capsys):
+    answers = iter(['nan', 'inf', '-5', 'abc', '250.5'])
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(answers))
+    assert scenario.AccountingSystem.ask_bonus() == 250.5
+    assert capsys.readouterr().out.count("скінченне") == 2
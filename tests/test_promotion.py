@@ -0,0 +1,24 @@
+import pytest
+
+from school_checks import check_consistent, load_school
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_rollback_restores_promoted_school(data_files, compact):
+    school = load_school(data_files, compact)
+    before = check_consistent(school)
+    school.get_all_students_data()  #кеш таблиці будується до переведення, потім зсувається
+    school.promote_all_classes(2)
+    promoted = check_consistent(school)
+    assert {p for p, *_ in promoted} == set(range(3, 12))
+
+    fork = school.fork()
+    fork.rollback_promotion(2)
+    assert check_consistent(fork) == before
+    assert check_consistent(school) == promoted
+
+    school.rollback_promotion()
+    school.rollback_promotion()
+    assert check_consistent(school) == before
+    with pytest.raises(ValueError):
+        school.rollback_promotion()
@@ -0,0 +1,54 @@
+import shutil
+
+import pytest
+
+from school import School, Student
+from school_checks import check_consistent, load_school
+
+
+def test_rollup_cache_matches_files_after_promotion(data_files, tmp_path):
+    classes_file, students_file = (shutil.copy(path, tmp_path) for path in data_files)
+    school = School('test')
+    school.load_data(classes_file, students_file, rollup_cache=True)
+    school.promote_all_classes()
+    school.get_class(2, 'А').add_student(Student('Новий', 'Учень', 'Петрович', 2018, 'Хлопець', 9.0))
+
+    cached = School('test')
+    cached.load_data(classes_file, students_file, keep_students=False, rollup_cache=True)
+    assert cached.stats.total == 72
+    assert sorted(parallel for (parallel,) in cached.rollup('parallel')) == list(range(1, 12))
+
+
+@pytest.mark.parametrize('compact', [False, True])
+@pytest.mark.parametrize('read_first', [False, True])
+def test_snapshot_keeps_state_when_source_changes(data_files, compact, read_first):
+    school = load_school(data_files, compact)
+    before = check_consistent(school)
+    snap = school.snapshot()
+    if read_first:  #знімок уже прочитано до змін - і він має свій стан, і джерело далі змінюється
+        assert snap.stats.total == 72
+
+    school.get_class(5, 'А').add_student(Student('Новий', 'Учень', 'Петрович', 2015, 'Хлопець', 9.0))
+    school.promote_all_classes()
+    assert check_consistent(snap) == before
+    assert snap.frozen and snap.year_offset == 0
+    with pytest.raises(ValueError):
+        snap.promote_all_classes()
+    with pytest.raises(ValueError):
+        snap.get_class(5, 'А').add_student(Student('Ще', 'Один', 'Учень', 2015, 'Хлопець', 9.0))
+    assert school.stats.total == 73 - len(snap.get_class(11, 'А').students) - len(snap.get_class(11, 'Б').students)
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_add_student_on_fork_is_isolated(data_files, compact):
+    school = load_school(data_files, compact)
+    before = check_consistent(school)
+    fork = school.fork()
+    fork.get_class(3, 'Б').add_student(Student('Форкова', 'Марія', 'Іванівна', 2017, 'Дівчина', 10.5))
+
+    assert check_consistent(school) == before
+    assert not school.search(name_prefix='Форкова')
+    after = check_consistent(fork)
+    assert len(after) == 73 and (3, 'Б', 'Форкова Марія Іванівна', 2017, 'Дівчина', 10.5) in after
+    assert [cls.get_name() for cls, _ in fork.search(name_prefix='форкова')] == ['3-Б']
+    assert len(fork.get_class(3, 'Б').students) == len(school.get_class(3, 'Б').students) + 1
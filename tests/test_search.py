@@ -0,0 +1,15 @@
+from school_checks import load_school
+
+
+def test_search_skips_graduated_classes(data_files):
+    school = load_school(data_files)
+    graduate = school.get_class(11, 'А').students[0]
+    name = graduate.get_full_name()
+    assert name in [s.get_full_name() for s in school.find_by_name(graduate.last_name)]
+
+    fork = school.fork()
+    fork.promote_all_classes()
+    assert name not in [s.get_full_name() for s in fork.find_by_name(graduate.last_name)]
+    assert name in [s.get_full_name() for s in school.find_by_name(graduate.last_name)]
+    fork.rollback_promotion()
+    assert name in [s.get_full_name() for s in fork.find_by_name(graduate.last_name)]
@@ -0,0 +1,11 @@
+from sqlite_repo import SqliteSchoolRepository
+
+
+def test_reimport_replaces_students(data_files):
+    repo = SqliteSchoolRepository()
+    assert repo.import_files('Ліцей', *data_files) == 72
+    assert repo.import_files('Інший ліцей', *data_files) == 72
+    assert repo.import_files('Ліцей', *data_files) == 72
+    assert repo.student_count(repo.school_id('Ліцей', create=False)) == 72
+    assert repo.student_count() == 144
+    repo.close()
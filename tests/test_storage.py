@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+import storage
+from school import STUDENT_DTYPES, School
+
+FORMATS = ['feather', 'parquet']
+
+
+def _convert(data_files, tmp_path, ext): #classes і students у форматі ext
+    paths = []
+    for src, name in zip(data_files, ('classes', 'students')):
+        paths.append(str(tmp_path / f"{name}.{ext}"))
+        storage.convert(src, paths[-1])
+    return paths
+
+
+@pytest.mark.parametrize('ext', FORMATS)
+def test_round_trip_keeps_table(data_files, tmp_path, ext):
+    pytest.importorskip('pyarrow')
+    students_file = data_files[1]
+    path = str(tmp_path / f"students.{ext}")
+    assert storage.convert(students_file, path) == 72
+    expected = storage.read_table(students_file, dtype=STUDENT_DTYPES)
+    #рядкові колонки зберігаються словником і читаються як категорії, значення ті самі
+    pd.testing.assert_frame_equal(storage.read_table(path, dtype=STUDENT_DTYPES), expected, check_dtype=False,
+                                  check_categorical=False)
+
+    chunks = list(storage.iter_chunks(path, 5))
+    assert [len(chunk) for chunk in chunks] == [5] * 14 + [2]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True).astype(STUDENT_DTYPES), expected,
+                                  check_dtype=False, check_categorical=False)
+
+    back = str(tmp_path / 'students.csv')
+    storage.convert(path, back)
+    with open(students_file, encoding='utf-8-sig') as a, open(back, encoding='utf-8-sig') as b:
+        assert a.read().splitlines() == b.read().splitlines()
+
+
+@pytest.mark.parametrize('ext', FORMATS)
+@pytest.mark.parametrize('chunksize', [None, 7])
+def test_school_loads_same_from_any_format(data_files, tmp_path, ext, chunksize):
+    pytest.importorskip('pyarrow')
+    expected = School('csv')
+    expected.load_data(*data_files)
+    school = School(ext)
+    school.load_data(*_convert(data_files, tmp_path, ext), chunksize=chunksize)
+
+    assert school.stats.total == expected.stats.total and school.load_errors == []
+    assert school.stats.genders == expected.stats.genders
+    assert [(c.get_name(), [s.get_full_name() for s in c.students]) for c in school.ordered_classes()] == \
+        [(c.get_name(), [s.get_full_name() for s in c.students]) for c in expected.ordered_classes()]
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        storage.read_table(str(tmp_path / 'students.xlsx'))